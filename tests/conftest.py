@@ -2,6 +2,8 @@ import pytest
 import os
 import tempfile
 import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from flask import Flask, request, jsonify
 from wifis_web_tool import HTTPRequestTool
 
@@ -110,18 +112,72 @@ def http_tool(test_client):
                 self.headers = dict(flask_response.headers)
                 self.raw = type('obj', (object,), {'version': 11.0})
                 self.reason = "OK"
+                self.encoding = flask_response.mimetype_params.get("charset")
+
+            def iter_content(self, chunk_size=1):
+                for offset in range(0, len(self.content), chunk_size):
+                    yield self.content[offset:offset + chunk_size]
+
+            def close(self):
+                pass
         
         return MockResponse(response)
     
     # Create HTTPRequestTool instance
     tool = HTTPRequestTool()
     
-    # Monkey patch the requests module
+    # Monkey patch the pooled sessions used for every outbound request
     import requests
-    original_request = requests.request
-    requests.request = mock_request
+    original_request = requests.Session.request
+    requests.Session.request = lambda self, method, url, **kwargs: mock_request(method, url, **kwargs)
     
     yield tool
     
     # Restore original requests
-    requests.request = original_request 
\ No newline at end of file
+    requests.Session.request = original_request 
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path == "/big":
+            body = b"A" * 200000
+        elif self.path == "/robots.txt":
+            body = b"User-agent: *\nDisallow: /admin/\n"
+        elif self.path == "/chunked":
+            # No Content-Length, the client has to count the bytes itself
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for _ in range(10):
+                self.wfile.write(b"1000\r\n" + b"B" * 4096 + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        elif self.path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "9")
+            self.end_headers()
+            self.wfile.write(b"not found")
+            return
+        else:
+            body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=abc")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def local_server():
+    # Real keep-alive HTTP server for tests that need actual sockets
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
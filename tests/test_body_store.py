@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from wifis_web_tool import BodyStore, HTTPRequestTool, app
+
+@pytest.fixture
+def body_store(tmp_path):
+    return BodyStore(preview_size=4, memory_cap=16, directory=str(tmp_path))
+
+def test_small_body_needs_no_handle(body_store):
+    captured = body_store.capture([b"ab", b"cd"])
+    assert captured["preview"] == b"abcd"
+    assert captured["handle"] is None
+    assert not captured["truncated"]
+
+def test_large_body_kept_in_memory(body_store):
+    captured = body_store.capture([b"hello ", b"world"], "text/plain")
+    assert captured["preview"] == b"hell"
+    assert captured["truncated"]
+    assert body_store.read(captured["handle"]) == b"hello world"
+    assert body_store.get_stats()["spilled"] == 0
+
+def test_body_past_memory_cap_spills_to_disk(body_store):
+    chunks = [b"0123456789"] * 5
+    captured = body_store.capture(iter(chunks))
+    assert captured["length"] == 50
+    assert captured["preview"] == b"0123"
+    stats = body_store.get_stats()
+    assert stats["spilled"] == 1
+    assert stats["disk_bytes"] == 50
+
+    # Two readers stream the same file independently
+    first = body_store.open(captured["handle"], chunk_size=7)["chunks"]
+    second = body_store.open(captured["handle"], chunk_size=7)["chunks"]
+    assert next(first) == next(second) == b"0123456"
+    assert b"0123456" + b"".join(first) == b"".join(chunks)
+
+def test_reader_outlives_eviction(body_store):
+    captured = body_store.capture([b"0123456789"] * 5)
+    spill = body_store.entries[captured["handle"]]["file"]
+    reader = body_store.open(captured["handle"], chunk_size=7)["chunks"]
+    assert next(reader) == b"0123456"
+
+    # The evicted file stays open until its last reader finishes
+    body_store.clear()
+    assert not spill.closed
+    assert b"0123456" + b"".join(reader) == b"0123456789" * 5
+    assert spill.closed
+
+def test_unstarted_reader_does_not_pin_file(body_store):
+    captured = body_store.capture([b"0123456789"] * 5)
+    spill = body_store.entries[captured["handle"]]["file"]
+    reader = body_store.open(captured["handle"])["chunks"]
+    reader.close()
+    body_store.clear()
+    assert spill.closed
+
+    # A reader opened before the eviction cannot read a deleted file
+    captured = body_store.capture([b"0123456789"] * 5)
+    reader = body_store.open(captured["handle"])["chunks"]
+    body_store.clear()
+    with pytest.raises(OSError):
+        next(reader)
+
+def test_max_body_size_stops_download(body_store):
+    body_store.max_body_size = 20
+    captured = body_store.capture(iter([b"0123456789"] * 100))
+    assert captured["length"] == 20
+    assert not captured["complete"]
+
+def test_entries_expire_and_evict(body_store):
+    body_store.max_entries = 1
+    first = body_store.capture([b"first body"])["handle"]
+    second = body_store.capture([b"x" * 40])["handle"]
+    assert body_store.open(first) is None
+    assert body_store.read(second) == b"x" * 40
+    assert body_store.get_stats()["evictions"] == 1
+
+    body_store.ttl = -1
+    assert body_store.open(second) is None
+    assert body_store.get_stats()["disk_bytes"] == 0
+
+def test_process_request_returns_preview_and_handle():
+    body = b"A" * 100000
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.reason = "OK"
+    mock_response.raw.version = 11
+    mock_response.headers = {"Content-Type": "text/plain"}
+    mock_response.encoding = "utf-8"
+    mock_response.iter_content.return_value = [body[i:i + 8192] for i in range(0, len(body), 8192)]
+
+    tool = HTTPRequestTool()
+    tool.body_store = BodyStore(preview_size=1024, memory_cap=4096)
+    with patch('requests.Session.request', return_value=mock_response) as request:
+        result = tool.process_request("GET / HTTP/1.1\nHost: example.com\n\n", use_cache=False)
+    assert request.call_args.kwargs["stream"] is True
+    assert mock_response.close.called
+    assert result["response"].endswith("\r\n\r\n" + "A" * 1024)
+    assert result["body_length"] == 100000
+    assert result["body_truncated"]
+    assert tool.body_store.read(result["body_handle"]) == body
+
+def test_response_body_route():
+    from wifis_web_tool import http_tool
+    handle = http_tool.body_store.capture([b"x" * (http_tool.body_store.preview_size + 1)])["handle"]
+    client = app.test_client()
+    response = client.get(f"/response_body/{handle}")
+    assert response.status_code == 200
+    assert len(response.data) == http_tool.body_store.preview_size + 1
+    assert client.get("/response_body/missing").status_code == 404
@@ -0,0 +1,70 @@
+import pytest
+from wifis_web_tool import ConnectionPool, RequestTimings
+
+def test_get_session_keyed_by_host_proxy_and_verify():
+    pool = ConnectionPool()
+    session = pool.get_session("https://example.com/a")
+    assert pool.get_session("https://example.com/b") is session
+    assert pool.get_session("https://example.com/a", verify=False) is not session
+    assert pool.get_session("https://example.com/a", proxies={"https": "http://127.0.0.1:8080"}) is not session
+    assert pool.get_session("https://other.com/") is not session
+
+def test_evict_idle():
+    pool = ConnectionPool(idle_timeout=0)
+    pool.get_session("https://example.com/")
+    pool.get_session("https://other.com/")
+    assert pool.get_stats()["sessions_evicted"] >= 1
+
+def test_connections_reused(local_server):
+    pool = ConnectionPool()
+    for _ in range(5):
+        response = pool.get(f"{local_server}/")
+        assert response.status_code == 200
+
+    stats = pool.get_stats()
+    assert stats["total_requests"] == 5
+    assert stats["total_connections_opened"] == 1
+    assert stats["total_connections_reused"] == 4
+
+    # Cookies from responses must not be replayed on later raw requests
+    assert len(pool.get_session(f"{local_server}/").cookies) == 0
+    pool.close()
+
+def test_request_phase_timings(local_server):
+    pool = ConnectionPool()
+    first = pool.get(f"{local_server}/big")
+    second = pool.get(f"{local_server}/")
+
+    # A new connection resolves and connects, a reused one only sends and waits
+    assert first.timings["reused"] is False
+    assert first.timings["dns"] is not None and first.timings["connect"] is not None
+    assert first.timings["tls"] is None
+    assert first.timings["ttfb"] >= 0 and first.timings["download"] >= 0
+    assert second.timings["reused"] is True
+    assert second.timings["dns"] is None
+
+    # Streamed responses are timed once the consumer is done with the body
+    streamed = pool.get(f"{local_server}/chunked", stream=True)
+    assert not hasattr(streamed, "timings")
+    b"".join(streamed.iter_content(4096))
+    assert pool.finish(streamed)["download"] is not None
+    assert pool.finish(streamed) is streamed.timings
+
+    stats = pool.timings.get_stats()
+    host = stats["hosts"][0]
+    assert host["host"] == local_server.split("//")[1]
+    assert host["requests"] == 3
+    assert host["reused"] == 2
+    assert host["phases"]["dns"]["count"] == 1
+    assert host["phases"]["ttfb"]["count"] == 3
+    assert len(host["phases"]["total"]["counts"]) == len(stats["buckets_ms"]) + 1
+    pool.close()
+
+def test_timing_percentiles():
+    timings = RequestTimings()
+    for value in [0.5, 3, 3, 40, 900]:
+        timings.record("example.com", None, dict.fromkeys(RequestTimings.PHASES, value) | {"reused": True})
+    ttfb = timings.get_stats()["hosts"][0]["phases"]["ttfb"]
+    assert ttfb["p50"] == 5
+    assert ttfb["p95"] == 1000
+    assert ttfb["max"] == 900
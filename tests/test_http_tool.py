@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from wifis_web_tool import HTTPRequestTool
+from wifis_web_tool import HTTPRequestTool, ParsedRequest
 
 @pytest.fixture
 def http_tool():
@@ -11,12 +11,14 @@ def test_process_request():
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.text = "Test Response"
+    mock_response.iter_content.return_value = [b"Test ", b"Response"]
+    mock_response.encoding = "utf-8"
     mock_response.headers = {"Content-Type": "text/html"}
     mock_response.raw.version = 11.0
     mock_response.reason = "OK"
 
-    # Mock requests.request to return our mock response
-    with patch('requests.request', return_value=mock_response) as mock_request:
+    # Mock the pooled session request to return our mock response
+    with patch('requests.Session.request', return_value=mock_response) as mock_request:
         tool = HTTPRequestTool()
         
         # Test basic request
@@ -27,13 +29,16 @@ def test_process_request():
         assert isinstance(result, dict)
         assert 'response' in result
         assert 'jwt_tokens' in result
+        assert result['response'].endswith("\r\n\r\nTest Response")
+        assert result['body_length'] == 13
+        assert result['body_handle'] is None
         
         # Test error case
         request_text = ""
         result = tool.process_request(request_text)
         assert 'error' in result
 
-def test_check_common_files():
+def test_check_common_files(tmp_path):
     # Create a simple mock response
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -43,9 +48,12 @@ def test_check_common_files():
 
     # Mock the file operations
     mock_common_files = ["/robots.txt", "/sitemap.xml", "/admin.php"]
+    # Wordlists are memory-mapped, so the list has to be a real file
+    wordlist = tmp_path / "common.txt"
+    wordlist.write_text("".join(f"{file}\n" for file in mock_common_files))
     
     with patch('builtins.open', MagicMock()) as mock_open, \
-         patch('requests.request', return_value=mock_response), \
+         patch('requests.Session.request', return_value=mock_response), \
          patch('json.load', return_value={'request_headers': {}, 'response_headers': {}}):
         
         # Configure the mock file to return our list of common files
@@ -56,6 +64,7 @@ def test_check_common_files():
         mock_open.return_value = mock_file
         
         tool = HTTPRequestTool()
+        tool.wordlists.register('common', str(wordlist))
         
         # Test basic request
         request_text = "GET / HTTP/1.1\nHost: test.com"
@@ -68,6 +77,7 @@ def test_check_common_files():
         assert 'files_found' in result
         assert 'found_files' in result
         assert 'checked_files' in result
+        assert result['total_files'] == len(mock_common_files)
         
         # Test error case
         request_text = ""
@@ -115,3 +125,174 @@ def test_analyze_headers():
         result = tool.analyze_headers(request_text)
         assert 'error' in result                      
 
+
+def test_probe_url_caps_body(local_server):
+    tool = HTTPRequestTool()
+
+    # Content-Length is trusted, only body_cap bytes are read
+    result = tool.probe_url(f"{local_server}/big", body_cap=1024)
+    assert result["status_code"] == 200
+    assert result["response_length"] == 200000
+    assert len(result["body"]) == 1024
+    assert result["truncated"] is True
+
+    # Without Content-Length the bytes are counted but not kept
+    result = tool.probe_url(f"{local_server}/chunked", body_cap=100)
+    assert result["response_length"] == 40960
+    assert result["body"] == b"B" * 100
+
+    result = tool.probe_url(f"{local_server}/missing")
+    assert result["status_code"] == 404
+    assert result["body"] == b"not found"
+    assert result["truncated"] is False
+
+def test_iter_common_files_resumes_from_checkpoint(local_server, tmp_path):
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_text("\n".join(f"/file{i}" for i in range(200)))
+
+    tool = HTTPRequestTool()
+    tool.wordlists.register('common', str(wordlist))
+    tool.checkpoint_store.directory = str(tmp_path / "state")
+    request_text = f"GET {local_server}/ HTTP/1.1\nHost: example.com"
+
+    # Interrupt the scan after the first batch of results
+    events = tool.iter_common_files(request_text, concurrency=2)
+    checked = 0
+    for event in events:
+        if event["type"] == "delta":
+            checked += len(event["checked_files"])
+            break
+    events.close()
+    assert len(list((tmp_path / "state").iterdir())) == 1
+
+    # The resumed scan only probes what is left and finishes with full counters
+    remaining = 0
+    for event in tool.iter_common_files(request_text, concurrency=2):
+        if event["type"] == "delta":
+            remaining += len(event["checked_files"])
+        last = event
+    assert checked <= 200 - remaining < 200
+    assert last["done"] and last["total_files_checked"] == 200
+    assert last["resumed_files"] == 200 - remaining
+    assert list((tmp_path / "state").iterdir()) == []
+
+def test_check_common_files_keeps_results_of_resumed_scan(local_server, tmp_path):
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_text("/robots.txt\n" + "\n".join(f"/file{i}" for i in range(199)))
+
+    tool = HTTPRequestTool()
+    tool.wordlists.register('common', str(wordlist))
+    tool.checkpoint_store.directory = str(tmp_path / "state")
+
+    events = tool.iter_common_files(local_server, concurrency=1)
+    for event in events:
+        if event["type"] == "delta" and event["found_files"]:
+            break
+    events.close()
+
+    # The hit from the interrupted run is part of the resumed result
+    result = tool.check_common_files(local_server, concurrency=2)
+    assert result["total_files_checked"] == 200
+    assert [f["url"] for f in result["found_files"]] == [f"{local_server}/robots.txt"]
+    assert result["resumed_files"] + len(result["checked_files"]) == 200
+
+def test_scan_with_other_session_does_not_resume(local_server, tmp_path):
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_text("\n".join(f"/file{i}" for i in range(200)))
+
+    tool = HTTPRequestTool()
+    tool.wordlists.register('common', str(wordlist))
+    tool.checkpoint_store.directory = str(tmp_path / "state")
+    request_text = f"GET {local_server}/ HTTP/1.1\nHost: example.com\nCookie: session=alice"
+
+    events = tool.iter_common_files(request_text, concurrency=2)
+    for event in events:
+        if event["type"] == "delta":
+            break
+    events.close()
+
+    # Another cookie or TLS setting starts over and leaves the first checkpoint alone
+    result = tool.check_common_files(request_text.replace("alice", "bob"), concurrency=2)
+    assert "resumed_files" not in result
+    assert len(result["checked_files"]) == 200
+    result = tool.check_common_files(request_text, verify=False, concurrency=2)
+    assert "resumed_files" not in result
+    assert len(list((tmp_path / "state").iterdir())) == 1
+
+def test_check_common_files_batch(local_server, tmp_path):
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_text("/robots.txt\n/missing\n")
+
+    tool = HTTPRequestTool()
+    tool.wordlists.register('common', str(wordlist))
+    tool.checkpoint_store.directory = str(tmp_path / "state")
+    other_server = local_server.replace("127.0.0.1", "localhost")
+
+    result = tool.check_common_files_batch([
+        local_server,
+        f"GET {other_server}/admin HTTP/1.1\nHost: example.com",
+        local_server
+    ])
+    assert result["total_files"] == 4
+    assert result["total_files_checked"] == 4
+    assert {f["target"] for f in result["checked_files"]} == {local_server, other_server}
+    assert sorted(f["url"] for f in result["found_files"]) == [
+        f"{local_server}/robots.txt",
+        f"{other_server}/robots.txt"
+    ]
+
+    result = tool.check_common_files_batch([local_server, "GET"])
+    assert "error" in result
+
+def test_check_common_files_flags_soft_404(local_server, tmp_path):
+    # The test server answers "ok" for any unknown path, like a catch-all route
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_text("/robots.txt\n/backup.zip\n/old/index.php\n/missing\n")
+
+    tool = HTTPRequestTool()
+    tool.wordlists.register('common', str(wordlist))
+    tool.checkpoint_store.directory = str(tmp_path / "state")
+
+    result = tool.check_common_files(local_server)
+    assert [f["url"] for f in result["found_files"]] == [f"{local_server}/robots.txt"]
+    checked = {f["file_path"]: f for f in result["checked_files"]}
+    assert checked["/backup.zip"]["soft_404"] is True
+    assert checked["/old/index.php"]["soft_404"] is True
+    assert "soft_404" not in checked["/missing"]
+
+def test_parsed_request():
+    text = "POST /login?next=/a HTTP/1.1\nhost: example.com\nX-Dup: 1\nx-dup: 2\nAuthorization: Bearer OLD\n\nuser=a&token=OLD\n"
+    parsed = ParsedRequest.parse(text)
+    assert (parsed.method, parsed.target, parsed.version) == ("POST", "/login?next=/a", "HTTP/1.1")
+    assert parsed.get_header("Host") == "example.com"
+    assert parsed.get_header("X-DUP") == "2"
+    assert parsed.get_url() == "https://example.com/login?next=/a"
+    assert parsed.body == "user=a&token=OLD"
+    assert ParsedRequest.parse("GET / HTTP/1.1\nHost: a").body is None
+
+    # Substitution reuses the parse of the template
+    variant = parsed.with_token("OLD", "NEW")
+    assert variant.get_header("authorization") == "Bearer NEW"
+    assert variant.body == "user=a&token=NEW"
+    assert variant.text == text.replace("OLD", "NEW")
+    assert parsed.get_header("Authorization") == "Bearer OLD"
+
+    with pytest.raises(ValueError):
+        ParsedRequest.parse("GET")
+    assert ParsedRequest.parse("Host: a", strict=False).get_header("host") is None
+
+def test_process_request_accepts_parsed_request():
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.reason = "OK"
+    mock_response.raw.version = 11
+    mock_response.headers = {}
+    mock_response.text = "ok"
+    mock_response.iter_content.return_value = [b"ok"]
+    mock_response.encoding = None
+    tool = HTTPRequestTool()
+    parsed = ParsedRequest.parse("GET /a HTTP/1.1\nhost: example.com\n\n")
+    with patch('requests.Session.request', return_value=mock_response) as request:
+        result = tool.process_request(parsed.with_token("/a", "/b"), use_cache=False)
+    assert result["response"].startswith("HTTP/1.1 200 OK")
+    assert "https://example.com/b" in request.call_args.args + tuple(request.call_args.kwargs.values())
@@ -0,0 +1,71 @@
+import json
+import pytest
+from wifis_web_tool import HTTPRequestTool, Intruder, app
+
+@pytest.fixture
+def intruder():
+    return HTTPRequestTool().intruder
+
+def expand(intruder, request_text, payloads, mode):
+    parts, defaults = intruder.parse_positions(request_text)
+    sources = [intruder.payload_source(spec)[0] for spec in payloads]
+    return [Intruder.build(parts, values) for _, values in intruder.iter_variants(defaults, sources, mode)]
+
+def test_parse_positions(intruder):
+    parts, defaults = intruder.parse_positions("GET /§a§?q=§b§ HTTP/1.1")
+    assert parts == ["GET /", "?q=", " HTTP/1.1"]
+    assert defaults == ["a", "b"]
+    with pytest.raises(ValueError):
+        intruder.parse_positions("GET /§a HTTP/1.1")
+    with pytest.raises(ValueError):
+        intruder.parse_positions("GET / HTTP/1.1")
+
+def test_sniper_keeps_other_defaults(intruder):
+    variants = expand(intruder, "§a§-§b§", [["1", "2"]], "sniper")
+    assert variants == ["1-b", "2-b", "a-1", "a-2"]
+
+def test_pitchfork_and_cluster_bomb(intruder):
+    payloads = [["1", "2", "3"], ["x", "y"]]
+    assert expand(intruder, "§a§-§b§", payloads, "pitchfork") == ["1-x", "2-y"]
+    assert expand(intruder, "§a§-§b§", payloads, "cluster_bomb") == ["1-x", "1-y", "2-x", "2-y", "3-x", "3-y"]
+    assert intruder.count_variants(2, [3, 2], "cluster_bomb") == 6
+    assert intruder.count_variants(2, [3, 2], "pitchfork") == 2
+    assert intruder.count_variants(2, [3], "sniper") == 6
+
+def test_variants_are_lazy(intruder):
+    parts, defaults = intruder.parse_positions("§a§§b§")
+    big = lambda: iter(range(10 ** 9))
+    variants = intruder.iter_variants(defaults, [big, big], "cluster_bomb")
+    assert next(variants)[1] == (0, 0)
+    assert next(variants)[1] == (0, 1)
+
+def test_wordlist_payloads(intruder, tmp_path):
+    path = tmp_path / "payloads.txt"
+    path.write_text("admin\n\nroot\n")
+    intruder.http_request_tool.wordlists.register("payloads", str(path))
+    assert expand(intruder, "/§x§", ["payloads"], "sniper") == ["/admin", "/root"]
+
+def test_iter_fuzz(intruder, local_server):
+    request_text = f"GET {local_server}/§x§ HTTP/1.1\nHost: 127.0.0.1\n\n"
+    events = list(intruder.iter_fuzz(request_text, [["big", "missing", "a", "b"]], concurrency=2))
+    assert events[0] == {"type": "start", "mode": "sniper", "positions": 1, "total": 4}
+    results = {entry["payloads"][0]: entry for event in events if event["type"] == "results" for entry in event["results"]}
+    assert results["big"]["status_code"] == 200
+    assert results["big"]["length"] == 200000
+    assert results["missing"]["status_code"] == 404
+    # Identical bodies share a hash
+    assert results["a"]["body_hash"] == results["b"]["body_hash"] != results["big"]["body_hash"]
+    assert events[-1]["type"] == "done"
+    assert events[-1]["sent"] == 4
+    assert events[-1]["errors"] == 0
+
+def test_iter_fuzz_validates_payload_sets(intruder):
+    assert "error" in next(intruder.iter_fuzz("§a§§b§", [["1"]], mode="pitchfork"))
+    assert "error" in next(intruder.iter_fuzz("§a§", [["1"]], mode="battering_ram"))
+    assert "error" in next(intruder.iter_fuzz("§a§", ["no-such-list"]))
+
+def test_fuzz_route():
+    client = app.test_client()
+    response = client.post("/fuzz", json={"request_text": "GET / HTTP/1.1", "payloads": [["1"]]})
+    assert response.status_code == 400
+    assert "No payload positions" in response.get_json()["error"]
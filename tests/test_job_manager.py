@@ -0,0 +1,87 @@
+import json
+import time
+import threading
+import pytest
+from wifis_web_tool import JobManager, app
+
+def wait_for(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.is_finished() and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+@pytest.fixture
+def job_manager():
+    return JobManager(max_workers=1, max_queued_per_owner=3)
+
+def test_submit_buffers_output(job_manager):
+    result = job_manager.submit("test", lambda cancel_event: [{"output": "a"}, {"output": "b"}], owner="alice")
+    job = wait_for(job_manager.get(result["job_id"]))
+    assert job.status == "done"
+
+    # A client re-attaching from an offset only gets the rest
+    start, chunks, finished = job.read(1)
+    assert start == 1
+    assert chunks == [{"output": "b"}]
+    assert finished
+
+def test_cancel_stops_job(job_manager):
+    release = threading.Event()
+
+    def work(cancel_event):
+        for i in range(1000):
+            yield {"output": i}
+            release.wait(0.01)
+
+    result = job_manager.submit("test", work, owner="alice")
+    job = job_manager.get(result["job_id"])
+    job_manager.cancel(result["job_id"])
+    wait_for(job)
+    assert job.status == "cancelled"
+    assert len(job.chunks) < 1000
+
+def test_owner_limit(job_manager):
+    block = threading.Event()
+    for _ in range(3):
+        assert "job_id" in job_manager.submit("test", lambda cancel_event: [block.wait(5) and {}], owner="alice")
+    assert "error" in job_manager.submit("test", lambda cancel_event: [], owner="alice")
+    assert "job_id" in job_manager.submit("test", lambda cancel_event: [], owner="bob")
+    block.set()
+
+def test_round_robin_between_owners(job_manager):
+    order = []
+    block = threading.Event()
+    job_manager.submit("test", lambda cancel_event: [block.wait(5) and {}], owner="setup")
+    for owner in ["alice", "alice", "alice", "bob"]:
+        job_manager.submit("test", lambda cancel_event, owner=owner: order.append(owner) or [], owner=owner)
+    block.set()
+
+    deadline = time.time() + 5
+    while len(order) < 4 and time.time() < deadline:
+        time.sleep(0.01)
+    # Bob's single job must not wait behind all of Alice's
+    assert order.index("bob") < 3
+
+def test_job_routes():
+    client = app.test_client()
+    response = client.post("/jobs/unknown", json={})
+    assert response.status_code == 404
+
+    response = client.post("/jobs/brute_force", json={"token": "not-a-jwt"})
+    job_id = response.get_json()["job_id"]
+
+    lines = [json.loads(line) for line in client.get(f"/jobs/{job_id}/stream").data.splitlines()]
+    assert lines[0]["success"] is False
+    assert lines[0]["offset"] == 0
+    assert lines[-1]["job"]["status"] == "done"
+
+    assert client.get(f"/jobs/{job_id}").get_json()["status"] == "done"
+    assert client.get("/jobs/missing").status_code == 404
+
+def test_invalid_brute_force_timeout_is_rejected():
+    client = app.test_client()
+    for value in ["soon", -1, None, [30]]:
+        for path in ["/jobs/jwt_pipeline", "/jwt_attack/pipeline"]:
+            response = client.post(path, json={"token": "a.b.c", "brute_force_timeout": value})
+            assert response.status_code == 400
+            assert "brute_force_timeout" in response.get_json()["error"]
@@ -0,0 +1,164 @@
+import base64
+import hashlib
+import hmac
+import json
+import pytest
+from unittest.mock import patch
+from wifis_web_tool import JWTCracker, MappedWordlist, HTTPRequestTool, SecretStore
+
+def make_token(secret, alg="HS256"):
+    encode = lambda data: base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+    header = encode(json.dumps({"alg": alg, "typ": "JWT"}).encode())
+    payload = encode(json.dumps({"sub": "1234567890"}).encode())
+    digest = JWTCracker.HMAC_ALGORITHMS[alg]
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), digest).digest()
+    return f"{header}.{payload}.{encode(signature)}"
+
+@pytest.fixture
+def cracker():
+    return JWTCracker(processes=2, shard_size=1024)
+
+@pytest.fixture
+def make_wordlist(tmp_path):
+    def make(*words):
+        path = tmp_path / "secrets.txt"
+        path.write_text("\n".join(words) + "\n")
+        return MappedWordlist(str(path), strip=False)
+    return make
+
+@pytest.mark.parametrize("alg", ["HS256", "HS384", "HS512"])
+def test_crack_chunk_matches_hmac(alg):
+    # Keys longer than the block size are hashed first, as in RFC 2104
+    secret = "k" * 200
+    token = make_token(secret, alg)
+    algorithm, signing_input, signature = JWTCracker.parse_token(token)
+    index, tried = JWTCracker.crack_chunk(algorithm, signing_input, signature, [b"a", b"b", secret.encode()])
+    assert (index, tried) == (2, 3)
+    assert JWTCracker.crack_chunk(algorithm, signing_input, signature, [b"a", b"b"]) == (None, 2)
+
+def test_crack_finds_secret(cracker, make_wordlist):
+    words = [f"word{i}" for i in range(1000)] + ["s3cr3t"]
+    events = list(cracker.crack(make_token("s3cr3t"), make_wordlist(*words)))
+    assert events[-1]["done"]
+    assert events[-1]["success"]
+    assert events[-1]["secret"] == "s3cr3t"
+    assert all(not event["done"] for event in events[:-1])
+
+def test_crack_exhausts_wordlist(cracker, make_wordlist):
+    result = list(cracker.crack(make_token("missing"), make_wordlist("a", "b", "c")))[-1]
+    assert result["success"] is False
+    assert result["error"] == "No matching secret found in wordlist"
+
+def test_crack_rejects_asymmetric_tokens(cracker, make_wordlist):
+    token = "eyJhbGciOiJSUzI1NiJ9.e30.c2ln"
+    result = list(cracker.crack(token, make_wordlist("a")))[-1]
+    assert result["success"] is False
+    assert "HS256" in result["details"]
+
+def test_brute_force_falls_back_to_native(tmp_path):
+    wordlist = tmp_path / "secrets.txt"
+    wordlist.write_text("one\ntwo\nhunter2\n")
+    tool = HTTPRequestTool()
+    tool.secret_store = SecretStore(str(tmp_path / "cracked.sqlite"))
+    tool.wordlists.register("test", str(wordlist))
+    with patch("shutil.which", return_value=None):
+        result = tool.jwt_attacks.brute_force_secret(make_token("hunter2"), wordlist="test")
+    assert result["success"]
+    assert result["engine"] == "native"
+    assert result["secret"] == "hunter2"
+
+def make_issuer_token(secret, issuer, subject):
+    encode = lambda data: base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+    header = encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = encode(json.dumps({"iss": issuer, "sub": subject}).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{encode(signature)}"
+
+def test_cracked_secrets_are_reused(tmp_path):
+    wordlist = tmp_path / "secrets.txt"
+    wordlist.write_text("one\ntwo\nhunter2\n")
+    tool = HTTPRequestTool()
+    tool.secret_store = SecretStore(str(tmp_path / "cracked.sqlite"))
+    tool.wordlists.register("test", str(wordlist))
+    first = make_issuer_token("hunter2", "auth.example.com", "alice")
+
+    with patch("shutil.which", return_value=None):
+        assert tool.jwt_attacks.brute_force_secret(first, wordlist="test")["engine"] == "native"
+
+        # The same token is answered from the store without touching the wordlist
+        result = tool.jwt_attacks.brute_force_secret(first, wordlist="missing")
+        assert result["engine"] == "potfile"
+        assert result["secret"] == "hunter2"
+
+        # A new token from the same issuer tries that issuer's secrets first
+        result = tool.jwt_attacks.brute_force_secret(make_issuer_token("hunter2", "auth.example.com", "bob"), wordlist="missing")
+        assert result["engine"] == "potfile"
+
+        # Other issuers still need the wordlist
+        result = tool.jwt_attacks.brute_force_secret(make_issuer_token("hunter2", "other.example.com", "bob"), wordlist="missing")
+        assert result["success"] is False
+
+    assert tool.secret_store.get_stats()["secrets"] == 2
+
+def test_broken_secret_store_is_reported(tmp_path):
+    wordlist = tmp_path / "secrets.txt"
+    wordlist.write_text("one\ntwo\nhunter2\n")
+    tool = HTTPRequestTool()
+    # A directory cannot be opened as a database, every query fails
+    tool.secret_store = SecretStore(str(tmp_path))
+    tool.wordlists.register("test", str(wordlist))
+
+    with patch("shutil.which", return_value=None):
+        events = list(tool.jwt_attacks.iter_brute_force_secret(make_token("hunter2"), wordlist="test"))
+    assert any("Failed to read cracked secrets" in event["output"] for event in events if not event.get("done"))
+    result = events[-1]
+    assert result["secret"] == "hunter2"
+    assert result["store_error"].startswith("Failed to record cracked secret")
+
+def test_secret_store_opens_on_first_use(tmp_path):
+    path = tmp_path / "state" / "cracked.sqlite"
+    store = SecretStore(str(path))
+    assert not path.exists()
+    store.record(b"a.b", "HS256", "", b"secret")
+    assert store.lookup(b"a.b") == [b"secret"]
+    assert path.exists()
+
+def test_crack_many_in_one_pass(tmp_path):
+    wordlist = tmp_path / "secrets.txt"
+    wordlist.write_text("\n".join(f"word{i}" for i in range(2000)) + "\nalpha\nbeta\n")
+    tokens = [
+        make_token("alpha"),
+        make_token("beta", "HS512"),
+        make_token("alpha", "HS384"),
+        make_token("gamma"),
+        "not-a-token"
+    ]
+    cracker = JWTCracker(processes=2, shard_size=1024)
+    with MappedWordlist(str(wordlist)) as mapped:
+        events = list(cracker.crack_many(tokens, mapped))
+
+    found = [event["found"] for event in events if event.get("found")]
+    assert sorted(item["index"] for item in found) == [0, 1, 2]
+    result = events[-1]
+    assert result["done"] and result["cracked"] == 3
+    assert [r.get("secret") for r in result["results"]] == ["alpha", "beta", "alpha", None, None]
+    assert "error" in result["results"][4]
+
+def test_brute_force_batch_uses_known_secrets(tmp_path):
+    wordlist = tmp_path / "secrets.txt"
+    wordlist.write_text("one\nhunter2\n")
+    tool = HTTPRequestTool()
+    tool.secret_store = SecretStore(str(tmp_path / "cracked.sqlite"))
+    tool.wordlists.register("test", str(wordlist))
+    first = make_issuer_token("hunter2", "auth.example.com", "alice")
+    second = make_issuer_token("hunter2", "auth.example.com", "bob")
+    other = make_token("hunter2")
+
+    assert tool.jwt_attacks.brute_force_secret(first, wordlist="test")["success"]
+    events = list(tool.jwt_attacks.iter_brute_force_batch([first, first, second, "", other, first], wordlist="test"))
+    result = events[-1]
+    assert result["cracked"] == 3
+    assert [r["engine"] for r in result["results"][:2]] == ["potfile", "potfile"]
+    assert result["results"][2]["secret"] == "hunter2"
+    # Numbered by the first copy of each token in the submitted list
+    assert [event["found"]["index"] for event in events if event.get("found")] == [0, 2, 4]
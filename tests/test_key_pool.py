@@ -0,0 +1,68 @@
+import time
+import jwt
+import pytest
+from wifis_web_tool import KeyPool, HTTPRequestTool
+
+def wait_for_fill(pool, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if all(count == pool.pool_size for count in pool.get_stats()["pools"].values()):
+            return
+        time.sleep(0.01)
+
+def test_take_comes_from_pool_and_refills():
+    pool = KeyPool(rsa_key_sizes=(1024,), ec_curves=('P-256',), pool_size=2)
+    pool.start()
+    wait_for_fill(pool)
+
+    first = pool.take('RSA', 1024)
+    assert pool.get_stats()["misses"] == 0
+    assert first["algorithm"] == 'RS256'
+    assert first["private_key"].key_size == 1024
+
+    # Every key is handed out once
+    assert pool.take('RSA', 1024) is not first
+    wait_for_fill(pool)
+    assert pool.get_stats()["pools"]["RSA-1024"] == 2
+
+def test_unpooled_size_is_generated_inline():
+    pool = KeyPool(rsa_key_sizes=(), ec_curves=(), pool_size=1)
+    key = pool.take('EC', 'P-384')
+    assert key["algorithm"] == 'ES384'
+    assert key["jwk"]["crv"] == 'P-384'
+    assert pool.get_stats()["misses"] == 1
+    with pytest.raises(ValueError):
+        pool.take('EC', 'P-999')
+
+def test_invalid_config_is_rejected():
+    with pytest.raises(ValueError):
+        KeyPool(pool_size=0)
+    with pytest.raises(ValueError):
+        KeyPool(rsa_key_sizes=(512,))
+    with pytest.raises(ValueError):
+        KeyPool(ec_curves=('P-999',))
+
+def test_fill_records_generation_errors():
+    pool = KeyPool(rsa_key_sizes=(1024,), ec_curves=(), pool_size=1)
+    def fail(key_type, size):
+        raise RuntimeError("no entropy")
+    pool.generate = fail
+    pool.start()
+    deadline = time.time() + 10
+    while pool.get_stats()["errors"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    stats = pool.get_stats()
+    assert stats["errors"] == 1
+    assert "no entropy" in stats["last_error"]
+    assert pool.thread.is_alive()
+
+def test_jwk_header_injection_ec_token_verifies():
+    tool = HTTPRequestTool()
+    token = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiIxMjM0NTY3ODkwIn0.c2ln"
+    result = tool.jwt_attacks.jwk_header_injection(token, key_type='EC')
+    assert result["success"]
+
+    # The injected JWK is the public half of the signing key
+    header = jwt.get_unverified_header(result["modified_token"])
+    public_key = jwt.algorithms.ECAlgorithm.from_jwk(header["jwk"])
+    assert jwt.decode(result["modified_token"], public_key, algorithms=["ES256"])["sub"] == "1234567890"
@@ -0,0 +1,68 @@
+import time
+import pytest
+import requests
+from wifis_web_tool import RateController
+
+@pytest.fixture
+def rate_controller():
+    return RateController(initial_concurrency=4, max_concurrency=8)
+
+def test_additive_increase(rate_controller):
+    for _ in range(8):
+        rate_controller.acquire("example.com")
+        rate_controller.release("example.com", status_code=200, latency=0.01)
+    assert rate_controller.get_stats()["example.com"]["concurrency"] == 5
+
+def test_multiplicative_decrease_on_429(rate_controller):
+    rate_controller.acquire("example.com")
+    rate_controller.release("example.com", status_code=429, retry_after="5")
+    stats = rate_controller.get_stats()["example.com"]
+    assert stats["concurrency"] == 2
+    assert stats["interval"] > 0
+    assert stats["throttled"] == 1
+    assert rate_controller.get_delay("example.com") > 4
+
+def test_latency_spike_holds_steady(rate_controller):
+    rate_controller.acquire("example.com")
+    rate_controller.release("example.com", status_code=200, latency=0.01)
+    before = rate_controller.hosts["example.com"]["concurrency"]
+    rate_controller.acquire("example.com")
+    rate_controller.release("example.com", status_code=200, latency=1.0)
+    assert rate_controller.hosts["example.com"]["concurrency"] == before
+
+def test_parse_retry_after():
+    assert RateController.parse_retry_after("7") == 7.0
+    assert RateController.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert RateController.parse_retry_after("soon") is None
+    assert RateController.parse_retry_after(None) is None
+
+def test_throttle_treats_timeouts_as_congestion(rate_controller):
+    with pytest.raises(requests.Timeout):
+        with rate_controller.throttle("example.com"):
+            raise requests.Timeout()
+    stats = rate_controller.get_stats()["example.com"]
+    assert stats["in_flight"] == 0
+    assert stats["throttled"] == 1
+
+def test_acquire_spaces_requests(rate_controller):
+    rate_controller.acquire("example.com", min_interval=0.1)
+    rate_controller.release("example.com", status_code=200)
+    start = time.time()
+    rate_controller.acquire("example.com", min_interval=0.1)
+    assert time.time() - start >= 0.05
+
+def test_throttle_backs_off_on_connection_errors(rate_controller):
+    for error in (requests.ConnectionError(), requests.exceptions.ChunkedEncodingError()):
+        with pytest.raises(type(error)):
+            with rate_controller.throttle("example.com"):
+                raise error
+    stats = rate_controller.get_stats()["example.com"]
+    assert stats["in_flight"] == 0
+    assert stats["throttled"] == 2
+    assert stats["concurrency"] == 1
+
+    # Errors that never reached the host leave the window alone
+    with pytest.raises(ValueError):
+        with rate_controller.throttle("example.com"):
+            raise ValueError()
+    assert rate_controller.hosts["example.com"]["concurrency"] == 1.0
@@ -0,0 +1,93 @@
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from wifis_web_tool import ResponseCache, HTTPRequestTool
+
+@pytest.fixture
+def cache():
+    return ResponseCache(ttl=60, max_entries=2, max_bytes=100)
+
+def test_key_uses_method_url_headers_and_body(cache):
+    key = cache.get_key("GET", "https://a.com/", {"Cookie": "a=1"})
+    assert key == cache.get_key("get", "https://a.com/", {"cookie": "a=1", "Connection": "close"})
+    assert key != cache.get_key("GET", "https://a.com/", {"Cookie": "a=2"})
+    assert key != cache.get_key("POST", "https://a.com/", {"Cookie": "a=1"})
+    assert key != cache.get_key("GET", "https://a.com/", {"Cookie": "a=1"}, "body")
+
+def test_key_uses_proxy_and_verify(cache):
+    key = cache.get_key("GET", "https://a.com/")
+    proxies = {"http": "http://127.0.0.1:8080", "https": "http://127.0.0.1:8080"}
+    assert key != cache.get_key("GET", "https://a.com/", proxies=proxies)
+    assert key != cache.get_key("GET", "https://a.com/", verify=False)
+
+def test_hits_misses_and_lru_eviction(cache):
+    cache.put("a", {"v": 1}, 10)
+    cache.put("b", {"v": 2}, 10)
+    assert cache.get("a") == {"v": 1}
+    cache.put("c", {"v": 3}, 10)
+    # b was the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+def test_size_based_eviction(cache):
+    cache.put("a", {"v": 1}, 60)
+    cache.put("b", {"v": 2}, 60)
+    assert cache.get("a") is None
+    assert cache.get_stats()["bytes"] == 60
+
+def test_ttl_expiry():
+    cache = ResponseCache(ttl=0)
+    cache.put("a", {"v": 1}, 1)
+    time.sleep(0.01)
+    assert cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+
+def test_process_request_uses_cache():
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.text = "Cached"
+    mock_response.iter_content.return_value = [b"Cached"]
+    mock_response.encoding = None
+    mock_response.headers = {}
+    mock_response.raw.version = 11
+    mock_response.reason = "OK"
+
+    with patch('requests.Session.request', return_value=mock_response) as mock_request:
+        tool = HTTPRequestTool()
+        request_text = "GET / HTTP/1.1\nHost: test.com"
+        first = tool.process_request(request_text, use_cache=True)
+        second = tool.process_request(request_text, use_cache=True)
+        assert first["response"] == second["response"]
+        assert mock_request.call_count == 1
+
+        # Requests without the flag always go to the network
+        tool.process_request(request_text)
+        assert mock_request.call_count == 2
+
+        # Going through a proxy is a different request
+        tool.process_request(request_text, use_proxy=True, proxy_address="127.0.0.1:8080", use_cache=True)
+        assert mock_request.call_count == 3
+
+def test_cache_hit_drops_evicted_body_handle():
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [b"x" * 100]
+    mock_response.encoding = None
+    mock_response.headers = {}
+    mock_response.raw.version = 11
+    mock_response.reason = "OK"
+
+    with patch('requests.Session.request', return_value=mock_response):
+        tool = HTTPRequestTool()
+        tool.body_store.preview_size = 10
+        request_text = "GET / HTTP/1.1\nHost: test.com"
+        first = tool.process_request(request_text, use_cache=True)
+        assert first["body_handle"] is not None
+        with tool.body_store.lock:
+            tool.body_store.remove(first["body_handle"])
+        second = tool.process_request(request_text, use_cache=True)
+        assert second["body_handle"] is None
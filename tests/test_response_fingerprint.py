@@ -0,0 +1,93 @@
+import threading
+import time
+import re
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from wifis_web_tool import ResponseFingerprinter, ResponseClusters, HTTPRequestTool
+
+@pytest.fixture
+def fingerprinter():
+    return ResponseFingerprinter()
+
+NOT_FOUND = "<html><head><title>Not Found</title></head><body><h1>Sorry</h1><p>The page {path} does not exist. Request id {nonce}</p><a href='/'>Home</a></body></html>"
+
+def test_soft_404_pages_match_despite_reflection_and_nonces(fingerprinter):
+    a = fingerprinter.fingerprint(200, NOT_FOUND.format(path="/backup.zip", nonce="9f86d081884c7d659a2feaa0c55ad015"), reflected=("/backup.zip",))
+    b = fingerprinter.fingerprint(200, NOT_FOUND.format(path="/x1y2z3", nonce="2c26b46b68ffc68ff99b453c1d304134"), reflected=("/x1y2z3",))
+    assert fingerprinter.distance(a, b) == 0
+    assert fingerprinter.similar(a, b)
+
+    # Same body with another status, or a different page, is not the same response
+    assert not fingerprinter.similar(a, dict(b, status_code=404))
+    other = fingerprinter.fingerprint(200, "User-agent: *\nDisallow: /admin/\nSitemap: https://example.com/sitemap.xml")
+    assert not fingerprinter.similar(a, other)
+
+def test_empty_bodies_compare_by_length(fingerprinter):
+    empty = fingerprinter.fingerprint(302, b"")
+    assert fingerprinter.similar(empty, fingerprinter.fingerprint(302, b"", length=10))
+    assert not fingerprinter.similar(empty, fingerprinter.fingerprint(302, b"", length=5000))
+
+def test_clusters_keep_one_sample_per_body(fingerprinter):
+    clusters = ResponseClusters(fingerprinter)
+    first = fingerprinter.fingerprint(200, NOT_FOUND.format(path="/old-login", nonce=""), reflected=("/old-login",))
+    same = fingerprinter.fingerprint(200, NOT_FOUND.format(path="/backup-2019", nonce=""), reflected=("/backup-2019",))
+    other = fingerprinter.fingerprint(200, "<html><body>Welcome back, admin. Your dashboard has three new alerts.</body></html>")
+    assert clusters.add(first, "first") == (0, True)
+    assert clusters.add(same, "same") == (0, False)
+    assert clusters.add(other, "other") == (1, True)
+    assert [cluster["count"] for cluster in clusters.summary()] == [2, 1]
+    assert clusters.clusters[0]["sample"] == "first"
+
+def test_clusters_find_near_duplicates_through_bands(fingerprinter):
+    clusters = ResponseClusters(fingerprinter)
+    base = fingerprinter.fingerprint(200, "some page body")
+    near = dict(base, simhash=f"{int(base['simhash'], 16) ^ 0b1011:016x}")
+    far = dict(base, simhash=f"{int(base['simhash'], 16) ^ 0xFFFF:016x}")
+    clusters.add(base)
+    assert clusters.add(near) == (0, False)
+    assert clusters.add(far) == (1, True)
+
+def test_baseline_taken_once_per_key(fingerprinter):
+    calls = []
+
+    def take():
+        calls.append(1)
+        time.sleep(0.05)
+        return [fingerprinter.fingerprint(404, b"not found")]
+
+    threads = [threading.Thread(target=fingerprinter.get_baseline, args=("target", take)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+
+    # A failed take is cached briefly, then tried again
+    assert fingerprinter.get_baseline("down", lambda: None) is None
+    assert fingerprinter.get_baseline("down", lambda: [{"x": 1}]) is None
+    fingerprinter.failure_ttl = 0
+    assert fingerprinter.get_baseline("flaky", lambda: None) is None
+    time.sleep(0.01)
+    assert fingerprinter.get_baseline("flaky", lambda: [{"x": 1}]) == [{"x": 1}]
+
+def test_soft_404_baseline_failure_is_not_retried_per_path(tmp_path):
+    tool = HTTPRequestTool()
+    wordlist = tmp_path / "paths.txt"
+    wordlist.write_text("".join(f"/file{i}\n" for i in range(20)))
+    tool.wordlists.register("paths", str(wordlist))
+    sent = []
+
+    def request(method, url, **kwargs):
+        sent.append(url)
+        # The random baseline paths time out, the wordlist paths answer
+        if re.search(r'/[0-9a-f]{32}', url):
+            raise requests.Timeout("timed out")
+        response = MagicMock()
+        response.status_code = 404
+        response.headers = {"Content-Length": "0"}
+        return response
+
+    with patch('requests.Session.request', side_effect=request):
+        list(tool.iter_common_files("https://slow.example.com", resume=False, wordlist="paths"))
+    assert len(sent) == 20 + 1
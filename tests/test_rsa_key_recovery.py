@@ -0,0 +1,45 @@
+import hashlib
+import hmac
+import base64
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives import serialization
+from wifis_web_tool import RSAKeyRecovery, HTTPRequestTool
+
+@pytest.fixture(scope="module")
+def private_key():
+    # e=3 keeps the GCD small enough for pure Python
+    return rsa.generate_private_key(public_exponent=3, key_size=1024)
+
+def test_encode_message_matches_signature(private_key):
+    token = jwt.encode({"sub": "a"}, private_key, algorithm="RS384")
+    algorithm, signing_input, signature = RSAKeyRecovery.parse_token(token)
+    numbers = private_key.public_key().public_numbers()
+    message = RSAKeyRecovery.encode_message(algorithm, signing_input, len(signature))
+    assert pow(int.from_bytes(signature, 'big'), numbers.e, numbers.n) == message
+
+def test_recover_rsa_key_and_sign_variants(private_key):
+    tool = HTTPRequestTool()
+    tool.rsa_key_recovery.exponents = (3,)
+    tokens = [jwt.encode({"sub": name}, private_key, algorithm="RS256", headers={"kid": "k1"}) for name in ("alice", "bob")]
+
+    events = list(tool.jwt_attacks.recover_rsa_key(tokens + ["not-a-token"]))
+    assert any("Skipping token #3" in event.get("output", "") for event in events)
+    result = events[-1]
+    assert result["success"] is True
+    assert int(result["n"]) == private_key.public_key().public_numbers().n
+
+    # Every variant is an HS256 token keyed with that encoding of the recovered key
+    pem = private_key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    variants = {variant["encoding"]: variant["token"] for variant in result["variants"]}
+    signing_input, signature = variants["pem"].rsplit('.', 1)
+    expected = hmac.new(pem, signing_input.encode(), hashlib.sha256).digest()
+    assert base64.urlsafe_b64decode(signature + '=' * (-len(signature) % 4)) == expected
+    assert jwt.get_unverified_header(variants["der"]) == {"alg": "HS256", "kid": "k1", "typ": "JWT"}
+    assert len(variants) == 7
+
+def test_recover_needs_two_tokens(private_key):
+    recovery = RSAKeyRecovery(exponents=(3,))
+    result = list(recovery.iter_recover([jwt.encode({}, private_key, algorithm="RS256")]))[-1]
+    assert result["success"] is False
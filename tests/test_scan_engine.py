@@ -0,0 +1,104 @@
+import time
+import threading
+import pytest
+import json
+from wifis_web_tool import ScanEngine, ScanProgress
+
+@pytest.fixture
+def scan_engine():
+    return ScanEngine(max_workers=4, per_host_limit=2)
+
+def test_run_returns_every_item(scan_engine):
+    results = list(scan_engine.run(lambda item: item * 2, range(10)))
+    assert sorted(item for item, _, _ in results) == list(range(10))
+    assert all(result == item * 2 for item, result, error in results)
+
+def test_run_completion_order(scan_engine):
+    # The slow item is submitted first but must be yielded last
+    def work(item):
+        time.sleep(0.2 if item == 0 else 0.01)
+        return item
+
+    order = [item for item, _, _ in scan_engine.run(work, range(3))]
+    assert order[-1] == 0
+
+def test_run_reports_errors(scan_engine):
+    def work(item):
+        raise ValueError("boom")
+
+    item, result, error = next(scan_engine.run(work, [1]))
+    assert result is None
+    assert isinstance(error, ValueError)
+
+def test_run_per_host_limit(scan_engine):
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+
+    def work(item):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+
+    list(scan_engine.run(work, range(12), host_for=lambda item: "example.com"))
+    assert active["max"] <= 2
+
+def test_scan_progress_sends_only_new_results():
+    progress = ScanProgress(total_files=4, batch_size=2, flush_interval=60, snapshot_every=3)
+    progress.add({"file_path": "/a", "success": False})
+    assert list(progress.events()) == []
+
+    progress.add({"file_path": "/b", "success": True}, {"file_path": "/b", "response_length": 1})
+    events = list(progress.events())
+    assert events[0]["type"] == "delta"
+    assert [f["file_path"] for f in events[0]["checked_files"]] == ["/a", "/b"]
+    assert events[0]["files_found"] == 1
+
+    progress.add({"file_path": "/c", "success": False})
+    events = list(progress.events(force=True))
+    assert [f["file_path"] for f in events[0]["checked_files"]] == ["/c"]
+    assert events[0]["found_files"] == []
+
+    # Periodic snapshot carries counters and hits but not the checked list
+    assert events[1]["type"] == "snapshot"
+    assert events[1]["total_files_checked"] == 3
+    assert events[1]["found_files"] == [{"file_path": "/b", "response_length": 1}]
+    assert "checked_files" not in events[1]
+    assert events[1]["seq"] > events[0]["seq"]
+
+    assert json.loads(ScanProgress.encode(events[1])) == events[1]
+
+def test_run_fair_interleaves_hosts(scan_engine):
+    queues = {
+        "a.com": [("a.com", i) for i in range(20)],
+        "b.com": [("b.com", i) for i in range(2)]
+    }
+    order = [item[0] for item, _, _ in scan_engine.run_fair(lambda item: item, queues, concurrency=2)]
+    assert len(order) == 22
+    # The short queue is not starved behind the long one
+    assert order[:6].count("b.com") == 2
+
+def test_run_fair_caps_slow_host(scan_engine):
+    lock = threading.Lock()
+    active = {"slow.com": 0, "max": 0}
+
+    def work(item):
+        host, _ = item
+        if host == "slow.com":
+            with lock:
+                active["slow.com"] += 1
+                active["max"] = max(active["max"], active["slow.com"])
+            time.sleep(0.05)
+            with lock:
+                active["slow.com"] -= 1
+        return item
+
+    queues = {
+        "slow.com": [("slow.com", i) for i in range(4)],
+        "fast.com": [("fast.com", i) for i in range(40)]
+    }
+    results = list(scan_engine.run_fair(work, queues, concurrency=4))
+    assert len(results) == 44
+    assert active["max"] <= 2
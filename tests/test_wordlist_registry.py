@@ -0,0 +1,73 @@
+import os
+import pytest
+from wifis_web_tool import WordlistRegistry, MappedWordlist
+
+@pytest.fixture
+def registry(tmp_path):
+    (tmp_path / "lists").mkdir()
+    (tmp_path / "lists" / "php.txt").write_text("/index.php\n/config.php\n")
+    registry = WordlistRegistry(directory=str(tmp_path / "lists"))
+    wordlist = tmp_path / "common.txt"
+    wordlist.write_text("/a\n/b\n\n/a\n  /c  \n")
+    registry.register("common", str(wordlist))
+    return registry
+
+def test_get_removes_duplicates(registry):
+    assert registry.get("common")["words"] == ("/a", "/b", "/c")
+
+def test_get_is_cached_until_file_changes(registry, tmp_path):
+    first = registry.get("common")
+    assert registry.get("common") is first
+
+    path = tmp_path / "common.txt"
+    path.write_text("/x\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+    assert registry.get("common")["words"] == ("/x",)
+
+def test_named_lists_from_directory(registry):
+    assert "php" in registry.names()
+    assert registry.get("php")["words"] == ("/index.php", "/config.php")
+    with pytest.raises(KeyError):
+        registry.get("../common")
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+def test_strip_false_keeps_whitespace(tmp_path):
+    path = tmp_path / "secrets.txt"
+    path.write_text(" secret \nsecret\r\n")
+    registry = WordlistRegistry(directory=None)
+    registry.register("jwt", str(path), strip=False)
+    assert registry.get("jwt")["words"] == (" secret ", "secret")
+
+def test_mapped_wordlist_shards_cover_every_entry(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_bytes(b"".join(b"word%d\r\n" % i for i in range(500)) + b"\n  last  ")
+    with MappedWordlist(str(path)) as wordlist:
+        shards = list(wordlist.shards(shard_size=100))
+        assert shards[0][0] == 0 and shards[-1][1] == wordlist.size
+        assert all(end == next_start for (_, end), (next_start, _) in zip(shards, shards[1:]))
+
+        # Shards end on line breaks, so together they hold every entry exactly once
+        from_shards = [line for start, end in shards for line in wordlist.read_shard(start, end)]
+        assert from_shards == [bytes(entry) for entry in wordlist.entries()]
+        assert from_shards[0] == b"word0" and from_shards[-1] == b"last"
+        assert len(wordlist) == 501
+
+def test_open_maps_and_remaps_on_change(registry, tmp_path):
+    first = registry.open("common")
+    assert registry.open("common") is first
+    assert [bytes(entry) for entry in first["wordlist"].entries()] == [b"/a", b"/b", b"/a", b"/c"]
+
+    path = tmp_path / "common.txt"
+    path.write_text("/x\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+    assert len(registry.open("common")["wordlist"]) == 1
+
+def test_empty_wordlist(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    with MappedWordlist(str(path)) as wordlist:
+        assert list(wordlist.shards()) == []
+        assert list(wordlist.entries()) == []
